@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 """
-Name: 
+Name:
    wordle
 
 Description:
@@ -14,8 +14,19 @@ Author: Sylvain Payot
 E-mail: sylvain.payot@gmail.com
 """
 
-
-from . import display, eval, game, load, player, valid
-from .display import display_wordle_guess_outcome
-from .game import WordleGame
+from . import _lazy, game, instrument, load, pattern, player, valid
+from .game import MultiBoardGame, WordleGame
 from .player import PossibleSolutionsMap, play_game
+
+# imported on first use: they depend on plotting and notebook packages (matplotlib,
+# plotly, scikit-learn, IPython) that games and players don't need.
+_LAZY_ATTRIBUTES = {
+    "display": ("wordle.display", None),
+    "eval": ("wordle.eval", None),
+    "display_wordle_guess_outcome": (
+        "wordle.display.game",
+        "display_wordle_guess_outcome",
+    ),
+}
+
+__getattr__, __dir__ = _lazy.make_getattr(globals(), _LAZY_ATTRIBUTES)
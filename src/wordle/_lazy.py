@@ -0,0 +1,35 @@
+"""attributes of a package imported on first use (cf. PEP 562)."""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any, Callable
+
+
+def make_getattr(
+    namespace: dict[str, Any], attributes: dict[str, tuple[str, str | None]]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """the `__getattr__` and `__dir__` functions of a package whose `attributes` are
+    imported on first use.
+
+    args:
+        namespace: the `globals()` of the package, where attributes are stored once
+            imported (so that `__getattr__` is only called once for each of them)
+        attributes: the module of each attribute, and the name of the attribute in that
+            module (None if the attribute is the module itself)"""
+
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(
+                f"module {namespace['__name__']!r} has no attribute {name!r}"
+            )
+        module_name, attribute = attributes[name]
+        module = importlib.import_module(module_name)
+        value = module if attribute is None else getattr(module, attribute)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
@@ -0,0 +1,303 @@
+"""benchmarks of the solver hot paths, compared against a stored baseline.
+
+    python -m wordle.benchmark --save    # records the baseline
+    python -m wordle.benchmark           # compares against it
+
+each benchmark is timed over a few runs (the fastest one is kept: the others are only
+slower because of unrelated activity), then run once more to record its peak memory:
+the largest amount of memory allocated at once (by python objects and numpy arrays)
+during the run. a benchmark regresses when its time or its peak memory exceeds the
+baseline's by more than a threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from wordle import eval, load
+from wordle.game import WordleGame
+from wordle.player import (
+    GameState,
+    GreedyPlayer,
+    PossibleSolutionsMap,
+    TwoStepPlayer,
+    get_all_candidate_entropies,
+)
+
+DATA_DIR = Path(__file__).parents[2] / "data/raw"
+DEFAULT_BASELINE_PATH = Path(__file__).parents[2] / "benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 0.2
+
+# fractions of the possible solutions whose candidate entropies are timed
+SUBSET_FRACTIONS = (1.0, 0.25, 0.05)
+
+# the `later_moves` benchmarks time the second guess of the games of these solutions
+_LATER_MOVES_TARGETS = ("crate", "lilac", "mummy", "vouch")
+
+# a benchmark is a set-up function returning the (argument-less) function to time.
+# set-up happens before every run, and isn't timed.
+Benchmark = Callable[[], Callable[[], object]]
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    attributes:
+        seconds: duration of the fastest run
+        peak_memory: number of bytes allocated at the peak of a run
+    """
+
+    seconds: float
+    peak_memory: int
+
+
+def build_benchmarks(
+    possible_words_path: Path = DATA_DIR / "possible_words.txt",
+    allowed_words_path: Path = DATA_DIR / "allowed_words.txt",
+    eval_words_path: Path = DATA_DIR / "sample_words.txt",
+    two_step_first_guesses: int = 5,
+) -> dict[str, Benchmark]:
+    """the benchmarks, by name. all of them use the map of the given possible and
+    allowed words, except the eval, which plays the game of each eval word, with the
+    eval words as both possible solutions and allowed words.
+
+    args:
+        two_step_first_guesses: number of first guesses whose two-step entropy is
+            computed by the `TwoStepPlayer` (cf. its `max_first_guesses`)"""
+    possible_solutions = load.load_words_as_dict(possible_words_path)
+    allowed_words = load.load_words_as_list(allowed_words_path)
+    psm = PossibleSolutionsMap(possible_solutions, allowed_words)
+    psm.build_map()
+    rng = np.random.default_rng(0)
+
+    def fresh_psm() -> PossibleSolutionsMap:
+        # a new starting map for every run: maps keep the histograms of their candidates
+        return psm.subset()
+
+    def two_step_player(starting_psm: PossibleSolutionsMap) -> TwoStepPlayer:
+        return TwoStepPlayer(starting_psm, max_first_guesses=two_step_first_guesses)
+
+    def first_outcomes(targets: list[str]) -> list:
+        guess = GreedyPlayer(psm).choose_guess(GameState(psm))
+        return [WordleGame(target).evaluate_guess(guess) for target in targets]
+
+    def build_map():
+        return PossibleSolutionsMap(possible_solutions, allowed_words).build_map
+
+    def filter_maps() -> Benchmark:
+        outcomes = first_outcomes(psm.solutions[:: max(1, psm.n_solutions // 50)])
+
+        def run():
+            return [psm.filter_based_on_guess_outcome(o) for o in outcomes]
+
+        # filtering leaves the starting map unchanged: it is set up once
+        return lambda: run
+
+    def candidate_entropies(fraction: float) -> Benchmark:
+        size = max(3, int(fraction * psm.n_solutions))
+        rows = np.sort(rng.choice(psm.n_solutions, size, replace=False))
+
+        def setup():
+            subset = psm.subset(rows)
+            return lambda: get_all_candidate_entropies(subset)
+
+        return setup
+
+    def first_move(make_player: Callable) -> Benchmark:
+        def setup():
+            player = make_player(fresh_psm())
+            return lambda: player.choose_guess(player.initial_state())
+
+        return setup
+
+    def later_moves(make_player: Callable) -> Benchmark:
+        targets = [word for word in _LATER_MOVES_TARGETS if word in possible_solutions]
+        outcomes = first_outcomes(targets or psm.solutions[:4])
+
+        def setup():
+            player = make_player(fresh_psm())
+            states = [player.advance(player.initial_state(), o) for o in outcomes]
+            return lambda: [player.choose_guess(state) for state in states]
+
+        return setup
+
+    def eval_player() -> Benchmark:
+        eval_words = load.load_words_as_dict(eval_words_path)
+        eval_psm = PossibleSolutionsMap(eval_words, list(eval_words))
+        eval_psm.build_map()
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                eval.eval_player(list(eval_words), GreedyPlayer(eval_psm))
+
+        return lambda: run
+
+    benchmarks = {
+        "build_map": build_map,
+        "filter_based_on_guess_outcome": filter_maps(),
+    }
+    for fraction in SUBSET_FRACTIONS:
+        benchmarks[f"get_all_candidate_entropies[{fraction:.0%}]"] = (
+            candidate_entropies(fraction)
+        )
+    for name, make_player in [("greedy", GreedyPlayer), ("two_step", two_step_player)]:
+        benchmarks[f"{name}.first_move"] = first_move(make_player)
+        benchmarks[f"{name}.later_moves"] = later_moves(make_player)
+    benchmarks["eval_player[sample_words]"] = eval_player()
+    benchmarks["import_wordle"] = import_wordle
+    return benchmarks
+
+
+def import_wordle() -> Callable[[], object]:
+    """imports the package in a new interpreter (whose memory isn't traced)."""
+    package_dir = str(Path(__file__).parents[1])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package_dir] + [p for p in [env.get("PYTHONPATH")] if p]
+    )
+    command = [sys.executable, "-c", "import wordle"]
+    return lambda: subprocess.run(command, env=env, check=True)
+
+
+def run_benchmark(benchmark: Benchmark, repeat: int = 3) -> BenchmarkResult:
+    """times `repeat` runs of `benchmark`, then traces the memory allocated by one more
+    run (tracing slows it down, so it isn't timed)."""
+    seconds = np.inf
+    for _ in range(repeat):
+        run = benchmark()
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    run = benchmark()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(seconds, peak_memory)
+
+
+def run_benchmarks(
+    benchmarks: dict[str, Benchmark], repeat: int = 3, quiet: bool = False
+) -> dict[str, BenchmarkResult]:
+    results = {}
+    for name, benchmark in benchmarks.items():
+        results[name] = run_benchmark(benchmark, repeat)
+        if not quiet:
+            print(f"{name:<40} {_format_result(results[name])}")
+    return results
+
+
+def find_regressions(
+    results: dict[str, BenchmarkResult],
+    baseline: dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """descriptions of the benchmarks whose time or peak memory exceeds the baseline's
+    by more than `threshold` (a fraction of the baseline). benchmarks missing from the
+    baseline are ignored."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, value in asdict(result).items():
+            reference = getattr(baseline[name], metric)
+            if value > reference * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {value:.4g} vs {reference:.4g} (+{value / reference - 1:.0%})"
+                )
+    return regressions
+
+
+def save_results(results: dict[str, BenchmarkResult], path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as fp:
+        json.dump({name: asdict(r) for name, r in results.items()}, fp, indent=4)
+
+
+def load_results(path: Path) -> dict[str, BenchmarkResult]:
+    with open(path, "r") as fp:
+        return {name: BenchmarkResult(**r) for name, r in json.load(fp).items()}
+
+
+def _format_result(result: BenchmarkResult) -> str:
+    return f"{result.seconds * 1e3:>10.2f} ms {result.peak_memory / 2**20:>10.2f} MB"
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m wordle.benchmark", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="save the results as the new baseline (only the benchmarks run with -k)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative increase of time or peak memory reported as a regression",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs")
+    parser.add_argument(
+        "-k", dest="pattern", help="only run the benchmarks whose name contains this"
+    )
+    parser.add_argument(
+        "--possible-words", type=Path, default=DATA_DIR / "possible_words.txt"
+    )
+    parser.add_argument(
+        "--allowed-words", type=Path, default=DATA_DIR / "allowed_words.txt"
+    )
+    parser.add_argument(
+        "--eval-words", type=Path, default=DATA_DIR / "sample_words.txt"
+    )
+    parser.add_argument("--two-step-first-guesses", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    benchmarks = build_benchmarks(
+        args.possible_words,
+        args.allowed_words,
+        args.eval_words,
+        args.two_step_first_guesses,
+    )
+    if args.pattern:
+        benchmarks = {n: b for n, b in benchmarks.items() if args.pattern in n}
+    results = run_benchmarks(benchmarks, args.repeat)
+
+    if args.save:
+        if args.pattern and args.baseline.exists():
+            # only the entries of the benchmarks run are updated
+            results = {**load_results(args.baseline), **results}
+        save_results(results, args.baseline)
+        print(f"baseline saved in `{args.baseline}`")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline in `{args.baseline}` (cf. --save)")
+        return 0
+
+    regressions = find_regressions(results, load_results(args.baseline), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
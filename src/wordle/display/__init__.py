@@ -1,3 +1,13 @@
-from .cm import plot_confusion_matrix
-from .distrib import plot_distrib
+from wordle import _lazy
+
 from .game import display_wordle_guess_outcome
+
+# imported on first use: matplotlib, plotly and scikit-learn take seconds to import
+_LAZY_ATTRIBUTES = {
+    "cm": ("wordle.display.cm", None),
+    "distrib": ("wordle.display.distrib", None),
+    "plot_confusion_matrix": ("wordle.display.cm", "plot_confusion_matrix"),
+    "plot_distrib": ("wordle.display.distrib", "plot_distrib"),
+}
+
+__getattr__, __dir__ = _lazy.make_getattr(globals(), _LAZY_ATTRIBUTES)
@@ -1,35 +1,63 @@
 from __future__ import annotations
 
+import contextlib
 import json
+from collections import Counter
 from dataclasses import dataclass, field
 from functools import partial
-from multiprocessing.pool import ThreadPool as Pool
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
 
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 
 from wordle import game as game_module
-from wordle import load
+from wordle import instrument, load
 from wordle import player as player_module
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+
 
 @dataclass
 class EvalResults:
+    """scores of evaluated games, by target word.
+
+    the number of games per score, the sum of scores and the number of games solved are
+    updated as scores are set: summaries (e.g. the progress printed during an eval) don't
+    depend on the number of games. scores must be set through `results[word] = score`,
+    rather than by modifying `scores` directly."""
+
     scores: dict[str, int] = field(default_factory=dict, repr=False)
 
-    def value_counts(self):
+    def __post_init__(self):
+        self._counts = Counter(self.scores.values())
+        self._total = sum(self.scores.values())
+        self._successes = sum(score > 0 for score in self.scores.values())
+
+    def value_counts(self) -> pd.Series:
+        import pandas as pd
+
         return (
-            pd.Series(self.scores)
-            .value_counts()
+            pd.Series(self._counts, dtype=int)
             .reindex(range(7), fill_value=0)
             .sort_index()
             .rename("counts")
         )
 
     def __setitem__(self, key, value):
+        if key in self.scores:
+            self._remove(self.scores[key])
         self.scores[key] = value
+        self._counts[value] += 1
+        self._total += value
+        self._successes += value > 0
+
+    def _remove(self, score: int) -> None:
+        self._counts[score] -= 1
+        self._total -= score
+        self._successes -= score > 0
 
     @property
     def eval_size(self):
@@ -37,14 +65,14 @@ class EvalResults:
 
     @property
     def avg_score(self):
-        return pd.Series(self.scores, dtype=float).mean()
+        return self._total / self.eval_size if self.scores else np.nan
 
     @property
     def success_rate(self):
-        return (pd.Series(self.scores) > 0).mean()
+        return self._successes / self.eval_size if self.scores else np.nan
 
     def distribution(self) -> list[int]:
-        return self.value_counts().values
+        return np.array([self._counts[score] for score in range(7)])
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(size={self.eval_size:,}, avg_score={self.avg_score:.2f}, dist={self.distribution()}, success_rate={self.success_rate:.1%})"
@@ -59,7 +87,53 @@ class EvalResults:
             scores = json.load(fp)
         return cls(scores)
 
-    def barplot(self, title: str):
+    @classmethod
+    def from_jsonl(cls, path: Path) -> EvalResults:
+        """reads a checkpoint written during an eval (cf. `eval_player`): one
+        `{"word": ..., "score": ...}` record per line. a line left incomplete (e.g. by an
+        interrupted eval) is ignored."""
+        results = cls()
+        with open(path, "r") as fp:
+            for line in fp:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                results[record["word"]] = record["score"]
+        return results
+
+    @classmethod
+    def merge(
+        cls, shards: list[EvalResults], eval_words_list: list[str] = None
+    ) -> EvalResults:
+        """combines the results of evals of disjoint sets of words (e.g. the shards of
+        an eval, cf. `shard_words`), ordered as `eval_words_list` if given.
+
+        raises a ValueError if a word was evaluated by several shards or, given
+        `eval_words_list`, if the words evaluated don't match it."""
+        results = cls()
+        for shard in shards:
+            overlap = results.scores.keys() & shard.scores.keys()
+            if overlap:
+                raise ValueError(
+                    f"words evaluated by several shards: {sorted(overlap)}"
+                )
+            for word, score in shard.scores.items():
+                results[word] = score
+
+        if eval_words_list is None:
+            return results
+        missing = set(eval_words_list) - results.scores.keys()
+        unexpected = results.scores.keys() - set(eval_words_list)
+        if missing or unexpected:
+            raise ValueError(
+                f"shards don't match the eval words: missing {sorted(missing)}, unexpected {sorted(unexpected)}"
+            )
+        return cls({word: results.scores[word] for word in eval_words_list})
+
+    def barplot(self, title: str) -> go.Figure:
+        import plotly.express as px
+
         fig = px.bar(
             self.value_counts(),
             template="plotly_dark",
@@ -87,32 +161,181 @@ def eval_player(
     eval_words_list: list[str],
     player: player_module.Player,
     pool_size: int = 1,
+    processes: bool = False,
+    lockstep: bool = False,
+    checkpoint: Path = None,
 ) -> EvalResults:
+    """plays a game for each word of `eval_words_list`.
 
-    get_score = partial(play_eval_game, player=player)
-    scores = EvalResults()
+    args:
+        pool_size: number of games played concurrently
+        processes: if True, games are played in a pool of `pool_size` worker processes,
+            each holding its own copy of `player`. the player's outcome matrix is not
+            copied: workers memory-map the same file (cf. `PatternMatrix.memory_mapped`).
+            otherwise, games are played in a pool of threads.
+        lockstep: if True, all games are played at once: the player makes a single
+            decision for all the games in the same state (cf.
+            `player.lockstep.play_games_in_lockstep`). this requires a deterministic
+            player, and ignores `pool_size` and `processes`.
+        checkpoint: path of a JSONL file each score is appended to as soon as its game
+            completes (cf. `EvalResults.from_jsonl`). if the file already exists, the
+            words it holds are not played again: an interrupted eval resumes where it
+            stopped.
+
+    results are ordered as `eval_words_list`, whatever the pool size and the order in
+    which games complete."""
 
-    with Pool(pool_size) as p:
-        for word, score in p.imap_unordered(get_score, eval_words_list):
+    scores = EvalResults()
+    if checkpoint is not None and Path(checkpoint).exists():
+        for word, score in EvalResults.from_jsonl(checkpoint).scores.items():
             scores[word] = score
-            print(scores, end="\r")
+    words_to_play = [word for word in eval_words_list if word not in scores.scores]
 
+    with instrument.span("eval_player", n_games=len(words_to_play)):
+        if lockstep:
+            games = player_module.lockstep.play_games_in_lockstep(
+                player, words_to_play
+            ).items()
+        elif processes:
+            games = _play_eval_games_in_processes(words_to_play, player, pool_size)
+        else:
+            games = _play_eval_games_in_threads(words_to_play, player, pool_size)
+
+        with _open_checkpoint(checkpoint) as fp:
+            for word, score in games:
+                scores[word] = score
+                if fp is not None:
+                    fp.write(json.dumps({"word": word, "score": score}) + "\n")
+                    fp.flush()
+                print(scores, end="\r")
+
+    scores = EvalResults({word: scores.scores[word] for word in eval_words_list})
     print(scores)
     return scores
 
 
+def _open_checkpoint(path: Path):
+    if path is None:
+        return contextlib.nullcontext()
+    path = Path(path)
+    if path.exists() and path.stat().st_size:
+        with open(path, "rb") as fp:
+            fp.seek(-1, 2)
+            incomplete = fp.read() != b"\n"
+        if incomplete:
+            # the last record was cut off: the next one starts on a new line
+            with open(path, "a") as fp:
+                fp.write("\n")
+    return open(path, "a")
+
+
+def _play_eval_games_in_threads(
+    eval_words_list: list[str], player: player_module.Player, pool_size: int
+) -> Iterator[tuple[str, int]]:
+    get_score = partial(play_eval_game, player=player)
+    with ThreadPool(pool_size) as p:
+        yield from p.imap_unordered(get_score, eval_words_list)
+
+
+def _play_eval_games_in_processes(
+    eval_words_list: list[str], player: player_module.Player, pool_size: int
+) -> Iterator[tuple[str, int]]:
+    starting_psm = getattr(player, "starting_psm", None)
+    matrix = starting_psm.pattern_matrix if starting_psm is not None else None
+    chunksize = player_module.workers.chunksize(len(eval_words_list), pool_size)
+
+    with player_module.workers.process_pool(pool_size, player, matrix) as p:
+        yield from p.imap_unordered(
+            _play_eval_game_in_worker, eval_words_list, chunksize=chunksize
+        )
+
+
+def _play_eval_game_in_worker(eval_word: str) -> tuple[str, int]:
+    return play_eval_game(eval_word, player_module.workers.worker_state())
+
+
+def shard_words(words: list[str], shard_index: int, n_shards: int) -> list[str]:
+    """the words evaluated by the shard `shard_index` (from 0) of an eval split into
+    `n_shards`: every `n_shards`-th word, so that shards have the same size (within 1)
+    and a mix of easy and hard words, whatever the order of `words`."""
+    if not 0 <= shard_index < n_shards:
+        raise ValueError(f"shard index {shard_index} not in [0, {n_shards})")
+    return words[shard_index::n_shards]
+
+
+def shard_path(path: Path, shard_index: int, n_shards: int) -> Path:
+    """path of the file written by a shard instead of `path` (e.g. `scores.json` ->
+    `scores.shard-0-of-4.json`)."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.shard-{shard_index}-of-{n_shards}{path.suffix}")
+
+
 def run_eval_from_config(config) -> tuple[EvalResults, go.Figure]:
+    """runs the eval described by `config`.
+
+    if `config` holds a `shard_index` and a `shard_count`, only that shard of the eval
+    words is evaluated (cf. `shard_words`). its results (and checkpoint) are saved to
+    per-shard paths (cf. `shard_path`), and no figure is made (None is returned
+    instead): once all shards are done, `merge_eval_shards` rebuilds the results of the
+    full eval."""
 
-    player_module.get_all_candidate_entropies.cache_clear()
+    # the player's solver cache is scoped to this evaluation
+    cache = getattr(config["player"], "cache", None)
+    if cache is not None:
+        cache.clear()
     eval_words_list = load.load_words_as_list(config["path_to_eval_words_list"])
+    path_to_json_output = config["path_to_json_output"]
+    checkpoint = config.get("path_to_checkpoint")
+
+    sharded = "shard_index" in config
+    if sharded:
+        shard = config["shard_index"], config["shard_count"]
+        eval_words_list = shard_words(eval_words_list, *shard)
+        path_to_json_output = shard_path(path_to_json_output, *shard)
+        if checkpoint is not None:
+            checkpoint = shard_path(checkpoint, *shard)
 
-    results = eval_player(eval_words_list, config["player"], pool_size=1)
+    results = eval_player(
+        eval_words_list,
+        config["player"],
+        pool_size=config.get("pool_size", 1),
+        processes=config.get("processes", False),
+        lockstep=config.get("lockstep", False),
+        checkpoint=checkpoint,
+    )
+    if cache is not None:
+        print(f"solver cache: {cache.stats}")
 
     # save results
+    results.to_json(path_to_json_output)
+    print(f"results saved in `{path_to_json_output}`")
+    if sharded:
+        return results, None
+
+    return results, _save_figure(results, config)
+
+
+def merge_eval_shards(config) -> tuple[EvalResults, go.Figure]:
+    """merges the results saved by the `shard_count` shards of the eval described by
+    `config` (cf. `run_eval_from_config`), and saves them as the results of the full
+    eval. raises a ValueError if a word is missing from the shards, or evaluated by
+    several of them."""
+    eval_words_list = load.load_words_as_list(config["path_to_eval_words_list"])
+    n_shards = config["shard_count"]
+    shards = [
+        EvalResults.from_json(shard_path(config["path_to_json_output"], i, n_shards))
+        for i in range(n_shards)
+    ]
+    results = EvalResults.merge(shards, eval_words_list)
+    print(results)
+
     results.to_json(config["path_to_json_output"])
     print(f"results saved in `{config['path_to_json_output']}`")
 
+    return results, _save_figure(results, config)
+
+
+def _save_figure(results: EvalResults, config) -> go.Figure:
     fig = results.barplot(title=config["fig_title"])
     fig.write_image(config["fig_name"])
-
-    return results, fig
+    return fig
@@ -3,9 +3,6 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
 
-import numpy as np
-
-_powers_of_three = (3 ** np.arange(5)).astype(np.uint8)
 Character = str
 
 
@@ -26,14 +23,35 @@ class GameOverException(Exception):
     pass
 
 
+class IllegalGuessException(Exception):
+    pass
+
+
 class GuessOutcome:
-    def __init__(self, guessed_letters: list[GuessedLetter]):
-        self.guessed_letters = guessed_letters
-        self.guess_word = "".join([gl.letter for gl in guessed_letters]).upper()
-        ternary = "".join([str(gl.result.value) for gl in guessed_letters])
-        self.ternary = ternary
-        # self.powers_of_three = (3 ** np.arange(len(guessed_letters))).astype(np.uint8)
-        self.uint8 = self._to_uint8(ternary)
+    """outcome of a guess: the guess and its outcome code (cf. `score_guess`).
+
+    the per-letter results (`guessed_letters`, `ternary`) are only computed on demand.
+    """
+
+    __slots__ = ("guess_word", "uint8", "_guessed_letters")
+
+    def __init__(self, guess_word: str, uint8: int):
+        self.guess_word = guess_word.upper()
+        self.uint8 = int(uint8)
+        self._guessed_letters = None
+
+    @property
+    def guessed_letters(self) -> list[GuessedLetter]:
+        if self._guessed_letters is None:
+            self._guessed_letters = [
+                GuessedLetter(pos, letter, CharacterResult(int(r)))
+                for pos, (letter, r) in enumerate(zip(self.guess_word, self.ternary))
+            ]
+        return self._guessed_letters
+
+    @property
+    def ternary(self) -> str:
+        return decimal_to_ternary(self.uint8, len(self.guess_word))
 
     def __getitem__(self, i: int):
         return self.guessed_letters[i]
@@ -47,25 +65,39 @@ class GuessOutcome:
     def __repr__(self):
         return f"{self.__class__.__name__}({self.guess_word}, {self.ternary}, uint8={self.uint8})"
 
-    @staticmethod
-    def _to_uint8(ternary: str):
-        return np.dot(
-            [int(x) for x in ternary],
-            _powers_of_three,
-        )
-
     @classmethod
     def from_uint8(cls, guess_word: str, uint8: int) -> GuessOutcome:
-        ternary = decimal_to_ternary(uint8, len(guess_word))
-        guessed_letters = [
-            GuessedLetter(pos, letter, CharacterResult(int(r)))
-            for pos, (letter, r) in enumerate(zip(guess_word, ternary))
-        ]
-        return cls(guessed_letters)
+        return cls(guess_word, uint8)
+
+    @classmethod
+    def from_guessed_letters(cls, guessed_letters: list[GuessedLetter]) -> GuessOutcome:
+        guessed_letters = sorted(guessed_letters, key=lambda x: x.position)
+        guess_word = "".join([gl.letter for gl in guessed_letters])
+        uint8 = sum(gl.result.value * 3**gl.position for gl in guessed_letters)
+        return cls(guess_word, uint8)
+
+
+def score_guess(guess_word: str, target_word: str) -> int:
+    """returns the outcome code of `guess_word` if the solution is `target_word` (both in
+    the same case): the sum of `CharacterResult` values of each letter times 3 ** position.
+
+    correct letters are matched first. other letters are then out of place, from left
+    to right, as long as the target still has an unmatched occurrence."""
+    unmatched = [t for g, t in zip(guess_word, target_word) if g != t]
+    code, power = 0, 1
+    for g, t in zip(guess_word, target_word):
+        if g == t:
+            code += 2 * power
+        elif g in unmatched:
+            code += power
+            unmatched.remove(g)
+        power *= 3
+    return code
 
 
 def decimal_to_ternary(uint8: int, word_length: int = 5) -> str:
-    """converts a uint8 representation of a guess outcome into a ternary representation."""
+    """converts the outcome code of a guess into its ternary representation (the result
+    of each letter, first letter first)."""
     if uint8 == 0:
         return "0" * word_length
     ternary = ""
@@ -76,10 +108,10 @@ def decimal_to_ternary(uint8: int, word_length: int = 5) -> str:
     return ternary.ljust(word_length, "0")
 
 
-def ternary_to_decimal(ternary: str):
-    ternary_arr = np.array([int(digit) for digit in ternary])
-    decimal = np.sum(ternary_arr[::-1] * _powers_of_three)
-    return decimal
+def ternary_to_decimal(ternary: str) -> int:
+    """converts a ternary representation (cf. `decimal_to_ternary`) into an outcome
+    code."""
+    return sum(int(digit) * 3**position for position, digit in enumerate(ternary))
 
 
 @dataclass
@@ -90,6 +122,7 @@ class WordleGame:
     guesses_so_far: list[GuessOutcome] = field(default_factory=list, repr=False)
     is_over: bool = False
     solved: bool = False
+    hard_mode: bool = False
 
     def __post_init__(self):
         self.target_word = self.target_word.upper()
@@ -100,22 +133,9 @@ class WordleGame:
     def random_choose_target_words(self) -> str:
         return "tests"
 
-    def evaluate_guess(self, guess_word: str):
+    def evaluate_guess(self, guess_word: str) -> GuessOutcome:
         guess_word = guess_word.upper()
-        guessed_letter_list = _find_correct_letters(self.target_word, guess_word)
-        leftover_target = _remove_correct(self.target_word, guessed_letter_list)
-        leftover_guess = _remove_correct(guess_word, guessed_letter_list)
-
-        for i, char in leftover_guess.items():
-            if char not in leftover_target.values():
-                guessed_letter_list.append(
-                    GuessedLetter(i, char, CharacterResult.ABSENT)
-                )
-            else:
-                guessed_letter_list.append(GuessedLetter(i, char, CharacterResult.OOP))
-                _remove_first_dict_item_with_value(leftover_target, char)
-
-        return _sort_and_convert_to_guess_outcome(guessed_letter_list)
+        return GuessOutcome(guess_word, score_guess(guess_word, self.target_word))
 
     def successful(self, guess_outcome: GuessOutcome):
         return self.target_word == guess_outcome.guess_word
@@ -124,6 +144,9 @@ class WordleGame:
         if self.is_over:
             raise GameOverException(f"this game is already over: \n{self}")
 
+        if self.hard_mode:
+            self.check_hard_mode_guess(guess_word)
+
         guess_outcome = self.evaluate_guess(guess_word)
         self.guesses_so_far.append(guess_outcome)
         self.number_of_guesses += 1
@@ -132,46 +155,90 @@ class WordleGame:
             self.is_over = True
             self.solved = True
 
-        if self.number_of_guesses == 6:
+        if self.number_of_guesses == self.max_guesses:
             self.is_over = True
 
         return guess_outcome
 
+    def check_hard_mode_guess(self, guess_word: str) -> None:
+        """raises an `IllegalGuessException` if `guess_word` doesn't use all the hints
+        revealed so far: correct letters must stay at their position, and OOP letters
+        must be used again (as many times as they were revealed)."""
+        guess_word = guess_word.upper()
+        for outcome in self.guesses_so_far:
+            for gl in outcome.get(CharacterResult.CORRECT):
+                if guess_word[gl.position] != gl.letter:
+                    raise IllegalGuessException(
+                        f"{guess_word}: position {gl.position + 1} must be `{gl.letter}`"
+                    )
+            revealed = [
+                gl.letter for gl in outcome if gl.result != CharacterResult.ABSENT
+            ]
+            for letter in set(revealed):
+                if guess_word.count(letter) < revealed.count(letter):
+                    raise IllegalGuessException(
+                        f"{guess_word}: guess must contain {revealed.count(letter)} `{letter}`"
+                    )
+
     @property
     def score(self) -> int:
         if not self.is_over:
             return None
         else:
-            return 6 - self.number_of_guesses + int(self.solved)
+            return self.max_guesses - self.number_of_guesses + int(self.solved)
 
 
-def _find_correct_letters(target_word: str, guess_word: str) -> list[GuessedLetter]:
-    return [
-        GuessedLetter(position, guess_char, CharacterResult.CORRECT)
-        for position, (guess_char, word_char) in enumerate(zip(target_word, guess_word))
-        if guess_char == word_char
-    ]
+@dataclass
+class MultiBoardGame:
+    """several boards (e.g. Dordle, Quordle) played at once: each guess is scored on
+    every board that isn't solved yet.
 
+    attributes:
+        target_words: the solution of each board
+        max_guesses: number of guesses allowed to solve all the boards (the number of
+            boards + 5 by default)
+        boards: the game of each board
+    """
 
-def _remove_correct(
-    word: str, correct_letters: list[GuessedLetter]
-) -> dict[int, Character]:
-    correct_positions = [letter.position for letter in correct_letters]
-    return {i: char for i, char in enumerate(word) if i not in correct_positions}
+    target_words: list[str]
+    max_guesses: int = None
+    boards: list[WordleGame] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.max_guesses is None:
+            self.max_guesses = len(self.target_words) + 5
+        self.boards = [WordleGame(word, self.max_guesses) for word in self.target_words]
+
+    @property
+    def n_boards(self) -> int:
+        return len(self.boards)
+
+    @property
+    def number_of_guesses(self) -> int:
+        return max(board.number_of_guesses for board in self.boards)
 
+    @property
+    def solved(self) -> bool:
+        return all(board.solved for board in self.boards)
 
-def _remove_first_dict_item_with_value(
-    leftover_target: dict[int, Character], char: Character
-) -> None:
-    if char not in leftover_target.values():
-        return leftover_target
+    @property
+    def is_over(self) -> bool:
+        return all(board.is_over for board in self.boards)
 
-    idx_to_remove = [i for i, c in leftover_target.items() if c == char][0]
-    _ = leftover_target.pop(idx_to_remove)
+    def record_player_guess(self, guess_word: str) -> list[GuessOutcome | None]:
+        """returns the outcome of the guess on each board (None for boards already
+        solved)."""
+        if self.is_over:
+            raise GameOverException(f"this game is already over: \n{self}")
 
+        return [
+            None if board.is_over else board.record_player_guess(guess_word)
+            for board in self.boards
+        ]
 
-def _sort_and_convert_to_guess_outcome(
-    guessed_letters: list[GuessedLetter],
-) -> GuessOutcome:
-    sorted_guessed_letters = sorted(guessed_letters, key=lambda x: x.position)
-    return GuessOutcome(sorted_guessed_letters)
+    @property
+    def score(self) -> int:
+        """the sum of the scores of the boards (cf. `WordleGame.score`)."""
+        if not self.is_over:
+            return None
+        return sum(board.score for board in self.boards)
@@ -0,0 +1,225 @@
+"""opt-in instrumentation of games and solvers.
+
+    with instrument.collect() as collector:
+        wd.eval.eval_player(eval_words, player)
+    print(collector.summary())
+    collector.to_chrome_trace("trace.json")  # cf. chrome://tracing or ui.perfetto.dev
+
+instrumented code opens spans (cf. `span`) around the steps worth timing: games, moves,
+map filters, entropy computations... and counts events (cf. `count`), e.g. solver cache
+hits and misses, or candidate entropies computed. each span records the events counted
+(by its thread) while it was open. when no collector is active, `span` and `count` only
+check a global variable: details that aren't free to compute are only added to spans
+(cf. `_Span.set`) if `enabled`.
+
+only the current process is instrumented: games played by worker processes (cf.
+`eval.eval_player`) aren't recorded.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_collector: Collector | None = None
+
+
+@dataclass
+class Event:
+    """a span: a step of the computation.
+
+    attributes:
+        start: start time (as given by `time.perf_counter_ns`)
+        duration: duration, in nanoseconds
+        thread: id of the thread the step ran in
+        args: details of the step, and the number of events counted during it
+    """
+
+    name: str
+    start: int
+    duration: int
+    thread: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class Collector:
+    """records the spans and counts of the instrumented code, while active (cf.
+    `collect`)."""
+
+    def __init__(self):
+        self.events: list[Event] = []
+        self.start = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_counts: list[Counter] = []
+
+    @property
+    def counts(self) -> Counter:
+        """the number of each event counted, over all threads."""
+        with self._lock:
+            return sum(self._thread_counts, Counter())
+
+    def summary(self) -> pd.DataFrame:
+        """for each kind of span: their number, total and mean durations (in seconds),
+        and the total of their numeric details (e.g. cache hits)."""
+        import pandas as pd
+
+        if not self.events:
+            return pd.DataFrame()
+        events = self.to_frame()
+        summary = events.groupby("name", sort=False).agg(
+            count=("duration", "size"),
+            total_seconds=("duration", "sum"),
+            mean_seconds=("duration", "mean"),
+        )
+        details = events.drop(columns=["start", "duration", "thread"])
+        numeric = details.select_dtypes("number").columns
+        return summary.join(details.groupby("name", sort=False)[numeric].sum())
+
+    def to_frame(self, name: str = None) -> pd.DataFrame:
+        """one row per span (only the spans called `name` if given), with its start
+        time (relative to the collector's) and duration, in seconds, and its details.
+        e.g. `to_frame("move")` describes each move of the games played."""
+        import pandas as pd
+
+        events = [e for e in self.events if name is None or e.name == name]
+        return pd.DataFrame(
+            [
+                {
+                    "name": e.name,
+                    "start": (e.start - self.start) / 1e9,
+                    "duration": e.duration / 1e9,
+                    "thread": e.thread,
+                    **e.args,
+                }
+                for e in events
+            ]
+        )
+
+    def to_chrome_trace(self, path: Path) -> None:
+        """saves the spans as a Chrome trace (JSON), readable by chrome://tracing and
+        Perfetto."""
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": e.name,
+                "ph": "X",
+                "ts": (e.start - self.start) / 1e3,
+                "dur": e.duration / 1e3,
+                "pid": pid,
+                "tid": e.thread,
+                "args": {k: _jsonable(v) for k, v in e.args.items()},
+            }
+            for e in self.events
+        ]
+        with open(path, "w") as fp:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, fp)
+
+    def _count(self, name: str, n: int) -> None:
+        self._thread_count()[name] += n
+
+    def _thread_count(self) -> Counter:
+        counts = getattr(self._local, "counts", None)
+        if counts is None:
+            counts = self._local.counts = Counter()
+            with self._lock:
+                self._thread_counts.append(counts)
+        return counts
+
+    def _record(self, event: Event) -> None:
+        with self._lock:
+            self.events.append(event)
+
+
+class _Span:
+    __slots__ = ("collector", "name", "args", "start", "counts")
+
+    def __init__(self, collector: Collector, name: str, args: dict):
+        self.collector = collector
+        self.name = name
+        self.args = args
+
+    def set(self, **args) -> None:
+        """adds details to the span (e.g. known only once the step is done)."""
+        self.args.update(args)
+
+    def __enter__(self) -> _Span:
+        self.counts = dict(self.collector._thread_count())
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        duration = time.perf_counter_ns() - self.start
+        for name, n in self.collector._thread_count().items():
+            if n != self.counts.get(name, 0):
+                self.args[name] = n - self.counts.get(name, 0)
+        self.collector._record(
+            Event(self.name, self.start, duration, threading.get_ident(), self.args)
+        )
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **args) -> None:
+        pass
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **args) -> _Span | _NullSpan:
+    """context manager recording the duration of a step, with its details `args`, if
+    a collector is active."""
+    if _collector is None:
+        return _NULL_SPAN
+    return _Span(_collector, name, args)
+
+
+def count(name: str, n: int = 1) -> None:
+    """counts `n` events called `name`, if a collector is active."""
+    if _collector is not None:
+        _collector._count(name, n)
+
+
+def enabled() -> bool:
+    """whether a collector is active: details that are costly to compute are only worth
+    computing then."""
+    return _collector is not None
+
+
+@contextlib.contextmanager
+def collect() -> Iterator[Collector]:
+    """instruments the code run in this context (in any thread), with a new collector."""
+    global _collector
+    if _collector is not None:
+        raise RuntimeError("a collector is already active")
+    _collector = Collector()
+    try:
+        yield _collector
+    finally:
+        _collector = None
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return str(value)
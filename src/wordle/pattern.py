@@ -0,0 +1,115 @@
+"""vectorized computation of guess outcomes.
+
+`WordleGame.evaluate_guess` scores one (guess, target) pair at a time. The functions
+below compute the same outcome codes (cf. `game.GuessOutcome.uint8`) for whole word
+lists at once, by encoding words as integer letter arrays and working on blocks of
+(solutions x guesses) pairs with array operations.
+
+words of L letters have 3 ** L outcome codes: they are stored as uint8 for words of up to
+5 letters, and as uint16 for longer words (up to 8 letters, cf. `outcome_dtype`).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_ORD_A = ord("a")
+
+MIN_WORD_LENGTH, MAX_WORD_LENGTH = 4, 8
+
+
+def outcome_dtype(word_length: int) -> np.dtype:
+    """smallest unsigned integer type holding the outcome codes of words of
+    `word_length` letters."""
+    if not MIN_WORD_LENGTH <= word_length <= MAX_WORD_LENGTH:
+        raise ValueError(
+            f"words should have {MIN_WORD_LENGTH} to {MAX_WORD_LENGTH} letters, not {word_length}"
+        )
+    return np.dtype(np.uint8 if 3**word_length <= 256 else np.uint16)
+
+
+def encode_words(words: list[str]) -> np.ndarray:
+    """encodes a list of words into a (n_words, word_length) uint8 array of letter
+    indices (`a` -> 0, ..., `z` -> 25)."""
+    words = [word.lower() for word in words]
+    if not words:
+        return np.empty((0, 0), dtype=np.uint8)
+
+    word_length = len(words[0])
+    if any(len(word) != word_length for word in words):
+        raise ValueError("all words should have the same length")
+
+    letters = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8)
+    return (letters - _ORD_A).reshape(len(words), word_length)
+
+
+def outcome_codes(solutions: np.ndarray, guesses: np.ndarray) -> np.ndarray:
+    """computes the outcome code of every guess against every solution.
+
+    args:
+        solutions: encoded solutions, of shape (n_solutions, word_length)
+        guesses: encoded guesses, of shape (n_guesses, word_length)
+
+    returns:
+        a (n_solutions, n_guesses) array (cf. `outcome_dtype`), where the value at [i, j] is the
+        `GuessOutcome.uint8` of guessing `guesses[j]` when the target is `solutions[i]`.
+
+    Repeated letters follow `WordleGame.evaluate_guess`: correct letters are matched
+    first, then remaining guess letters are flagged OOP from left to right, as long as
+    the target still has an unmatched occurrence of that letter."""
+    word_length = solutions.shape[1]
+    target = [solutions[:, k, None] for k in range(word_length)]
+    unmatched = [target[k] != guesses[:, k] for k in range(word_length)]
+    dtype = outcome_dtype(word_length)
+    codes = np.zeros((len(solutions), len(guesses)), dtype=dtype)
+
+    for i in range(word_length):
+        letter = guesses[:, i]
+        # occurrences of this letter among the target letters that are not correct...
+        available = np.zeros(codes.shape, dtype=np.int8)
+        for k in range(word_length):
+            available += (target[k] == letter) & unmatched[k]
+        # ... minus the ones already claimed by previous guess letters that are not correct
+        for j in range(i):
+            available -= (guesses[:, j] == letter) & unmatched[j]
+
+        result = np.where(unmatched[i], available > 0, 2)
+        codes += result.astype(dtype) * dtype.type(3**i)
+
+    return codes
+
+
+def build_outcome_matrix(
+    solutions: list[str],
+    guesses: list[str],
+    row_chunk_size: int = 128,
+    col_chunk_size: int = 1024,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """pre-computes guess outcomes between all `guesses` and all `solutions`.
+
+    the work is split in (row_chunk_size x col_chunk_size) blocks to keep intermediate
+    arrays small. returns a (n_solutions, n_guesses) array (cf. `outcome_dtype`).
+
+    args:
+        out: the array to fill (allocated if None). a memory-mapped array (e.g. from
+            `np.lib.format.open_memmap`) is filled block by block, without holding the
+            whole matrix in memory."""
+    encoded_solutions = encode_words(solutions)
+    encoded_guesses = encode_words(guesses)
+    if encoded_solutions.shape[1] != encoded_guesses.shape[1]:
+        raise ValueError("solutions and guesses should have the same length")
+
+    dtype = outcome_dtype(encoded_guesses.shape[1])
+    matrix = (
+        np.empty((len(solutions), len(guesses)), dtype=dtype) if out is None else out
+    )
+    for row in range(0, len(solutions), row_chunk_size):
+        rows = slice(row, row + row_chunk_size)
+        for col in range(0, len(guesses), col_chunk_size):
+            cols = slice(col, col + col_chunk_size)
+            matrix[rows, cols] = outcome_codes(
+                encoded_solutions[rows], encoded_guesses[cols]
+            )
+
+    return matrix
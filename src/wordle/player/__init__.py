@@ -1,5 +1,28 @@
-from . import base, greedy, map, two_step
-from .base import Player, play_game
+from . import (
+    base,
+    greedy,
+    lockstep,
+    map,
+    matrix_cache,
+    multi_board,
+    optimal,
+    solver_cache,
+    tiled,
+    tree,
+    two_step,
+    workers,
+)
+from .base import BasePlayer, GameState, Player, play_game
 from .greedy import GreedyPlayer
-from .map import PossibleSolutionsMap, get_all_candidate_entropies
+from .lockstep import play_games_in_lockstep
+from .map import (
+    PossibleSolutionsMap,
+    get_all_candidate_entropies,
+    load_or_build_map,
+)
+from .multi_board import MultiBoardPlayer, MultiBoardState, play_multi_board_game
+from .optimal import OptimalPlayer, OptimalSolver
+from .solver_cache import SolverCache
+from .tiled import TiledGreedyPlayer
+from .tree import StrategyTree, TreePlayer
 from .two_step import TwoStepPlayer
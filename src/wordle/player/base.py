@@ -1,27 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
 from typing import Protocol
 
+from wordle import instrument
 from wordle.display.game import display_wordle_guess_outcome
 from wordle.game import GuessOutcome, WordleGame
+from wordle.player.map import PossibleSolutionsMap
+
+
+@dataclass(frozen=True)
+class GameState:
+    """immutable state of a game, from a player's point of view.
+
+    attributes:
+        psm: the remaining possible solutions
+        history: the outcomes of the guesses made so far
+    """
+
+    psm: PossibleSolutionsMap
+    history: tuple[GuessOutcome, ...] = ()
+
+    def advance(self, guess_outcome: GuessOutcome) -> GameState:
+        """returns the state following `guess_outcome`."""
+        return GameState(
+            self.psm.filter_based_on_guess_outcome(guess_outcome),
+            self.history + (guess_outcome,),
+        )
+
+    @property
+    def number_of_guesses(self) -> int:
+        return len(self.history)
+
+    @property
+    def n_solutions(self) -> int:
+        """number of remaining possible solutions."""
+        return self.psm.n_solutions
 
 
 class Player(Protocol):
-    def make_next_guess(self, game: WordleGame) -> str:
-        ...
+    """a player decides on guesses based on immutable game states only, so that a single
+    player can play many games at the same time (e.g. from several threads)."""
+
+    def initial_state(self) -> GameState: ...
+
+    def choose_guess(self, state: GameState) -> str: ...
+
+    def advance(self, state: GameState, guess_outcome: GuessOutcome) -> GameState: ...
 
-    def update(self, guess_outcome: GuessOutcome) -> None:
-        ...
+
+class BasePlayer(Player):
+    """provides a default `initial_state` / `advance`, and the legacy stateful interface.
+
+    `start_new_game`, `make_next_guess` and `update` keep the state of a single game on
+    the player itself: unlike `play_game`, they are not safe to use for concurrent games.
+    """
+
+    starting_psm: PossibleSolutionsMap
+
+    def initial_state(self) -> GameState:
+        return GameState(self.starting_psm)
+
+    def advance(self, state: GameState, guess_outcome: GuessOutcome) -> GameState:
+        return state.advance(guess_outcome)
+
+    @property
+    def current_state(self) -> GameState:
+        if getattr(self, "_current_state", None) is None:
+            self._current_state = self.initial_state()
+        return self._current_state
 
     def start_new_game(self) -> None:
-        ...
+        self._current_state = self.initial_state()
+
+    def make_next_guess(self, game: WordleGame) -> str:
+        with instrument.span("make_next_guess") as span:
+            if instrument.enabled():
+                span.set(n_solutions=_n_solutions(self.current_state))
+            return self.choose_guess(self.current_state)
+
+    def update(self, guess_outcome: GuessOutcome) -> None:
+        with instrument.span("update"):
+            self._current_state = self.advance(self.current_state, guess_outcome)
 
 
 def play_game(player: Player, game: WordleGame, quiet: bool = False) -> WordleGame:
-    player.start_new_game()
-    while not game.is_over:
-        guess = player.make_next_guess(game)
-        outcome = game.record_player_guess(guess)
-        player.update(outcome)
-        if not quiet:
-            display_wordle_guess_outcome(outcome)
+    state = player.initial_state()
+    with instrument.span("game", target=game.target_word):
+        while not game.is_over:
+            with instrument.span("move", move=game.number_of_guesses + 1) as move:
+                if instrument.enabled():
+                    move.set(n_solutions=_n_solutions(state))
+                with instrument.span("choose_guess"):
+                    guess = player.choose_guess(state)
+                with instrument.span("record_player_guess"):
+                    outcome = game.record_player_guess(guess)
+                with instrument.span("advance"):
+                    state = player.advance(state, outcome)
+                move.set(guess=outcome.guess_word)
+            if not quiet:
+                display_wordle_guess_outcome(outcome)
 
     return game
+
+
+def _n_solutions(state) -> int | None:
+    """number of remaining solutions in a player's state (None if unknown, e.g. for a
+    `TreeState`)."""
+    return getattr(state, "n_solutions", None)
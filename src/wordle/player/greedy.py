@@ -1,21 +1,35 @@
-from wordle import game, player
 from wordle.player import map
+from wordle.player.base import BasePlayer, GameState
+from wordle.player.solver_cache import SolverCache
 
 
-class GreedyPlayer:
-    def __init__(self, starting_psm: map.PossibleSolutionsMap):
-        self._starting_psm = starting_psm
-        self.psm = starting_psm
+class GreedyPlayer(BasePlayer):
+    def __init__(
+        self,
+        starting_psm: map.PossibleSolutionsMap,
+        cache: SolverCache = None,
+        hard_mode: bool = False,
+    ):
+        """
+        args:
+            cache: caches the best guess for each state seen by this player (a new cache
+                holding up to 300 states by default)
+            hard_mode: if True, guesses use all the hints revealed so far (cf.
+                `PossibleSolutionsMap.with_hard_mode`)"""
+        self.starting_psm = starting_psm.with_hard_mode() if hard_mode else starting_psm
+        self.cache = cache if cache is not None else SolverCache(max_entries=300)
 
-    def make_next_guess(self, game: game.WordleGame) -> str:
+    def choose_guess(self, state: GameState) -> str:
         # select candidate guess with highest entropy
-        if len(self.psm.possible_solutions) <= 2:
-            return self.psm.possible_solutions.index[0]
+        if state.psm.n_solutions <= 2:
+            return state.psm.solutions[0]
 
-        return player.get_all_candidate_entropies(self.psm).index[0]
+        return self.cache.get_or_compute(
+            ("best_candidate", state.psm.state_id),
+            lambda: map.best_candidate(state.psm),
+        )
 
-    def update(self, guess_outcome: game.GuessOutcome) -> None:
-        self.psm = self.psm.filter_based_on_guess_outcome(guess_outcome)
-
-    def start_new_game(self) -> None:
-        self.psm = self._starting_psm
+    @property
+    def psm(self) -> map.PossibleSolutionsMap:
+        """remaining possible solutions of the game played with the legacy interface."""
+        return self.current_state.psm
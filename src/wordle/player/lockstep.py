@@ -0,0 +1,131 @@
+"""plays many games at once, one decision per distinct game state.
+
+all the games of an evaluation start from the same state, and most of them share their
+first guesses and outcomes. instead of playing each game on its own, targets are
+advanced together: games in the same state form a group, the player makes a single
+decision for the whole group, and the group is split by outcome code (read from the
+outcome matrix). the work is proportional to the number of distinct decisions, not to
+the number of games times the number of guesses.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from wordle import instrument, pattern
+from wordle.game import GuessOutcome
+from wordle.player.base import Player
+
+
+@dataclass(frozen=True)
+class Decision:
+    """a guess made by a player for a group of games in the same state.
+
+    attributes:
+        node_id: unique id of the decision (in the order decisions are made)
+        parent_id: id of the previous decision of those games (-1 for the first guess)
+        code: outcome code of the previous guess that led to this state (-1 for the
+            first guess)
+        depth: number of guesses made before this one
+        guess: the guess made
+        targets: target words of the games in this state
+    """
+
+    node_id: int
+    parent_id: int
+    code: int
+    depth: int
+    guess: str
+    targets: list[str]
+
+
+def play_games_in_lockstep(
+    player: Player,
+    target_words: list[str],
+    max_guesses: int = 6,
+    on_decision: Callable[[Decision], None] = None,
+) -> dict[str, int]:
+    """plays a game for each target word with a deterministic `player`.
+
+    args:
+        on_decision: called with each decision made by the player
+
+    returns:
+        the score of each game (cf. `WordleGame.score`)"""
+    scores = {}
+    codes_source = _OutcomeCodes(player, target_words)
+
+    # each group: (state, decision id of the parent, outcome code, target indices)
+    groups = [(player.initial_state(), -1, -1, np.arange(len(target_words)))]
+    n_decisions = 0
+
+    for depth in range(max_guesses):
+        next_groups = []
+        for state, parent_id, code, targets in groups:
+            with instrument.span("decision", depth=depth, n_games=len(targets)):
+                guess = player.choose_guess(state)
+            if on_decision is not None:
+                on_decision(
+                    Decision(
+                        n_decisions,
+                        parent_id,
+                        code,
+                        depth,
+                        guess,
+                        [target_words[t] for t in targets],
+                    )
+                )
+
+            codes = codes_source.get(guess, targets)
+            order = np.argsort(codes, kind="stable")
+            split_codes, starts = np.unique(codes[order], return_index=True)
+
+            for outcome_code, group in zip(split_codes, np.split(order, starts[1:])):
+                group_targets = targets[group]
+                if outcome_code == codes_source.solved_code:
+                    # only the game whose target is `guess` can be solved
+                    scores[target_words[group_targets[0]]] = max_guesses - depth
+                elif depth + 1 == max_guesses:
+                    scores.update({target_words[t]: 0 for t in group_targets})
+                else:
+                    outcome = GuessOutcome.from_uint8(guess, int(outcome_code))
+                    next_groups.append(
+                        (
+                            player.advance(state, outcome),
+                            n_decisions,
+                            int(outcome_code),
+                            group_targets,
+                        )
+                    )
+            n_decisions += 1
+        groups = next_groups
+
+    return scores
+
+
+class _OutcomeCodes:
+    """outcome codes of a guess for a subset of the target words, read from the player's
+    outcome matrix when it covers all the targets, and computed otherwise."""
+
+    def __init__(self, player: Player, target_words: list[str]):
+        self.target_words = target_words
+        self.solved_code = 3 ** len(target_words[0]) - 1 if target_words else 0
+        self.matrix = None
+        self.rows = None
+
+        starting_psm = getattr(player, "starting_psm", None)
+        if starting_psm is not None:
+            matrix = starting_psm.pattern_matrix
+            rows = [matrix.row_index.get(word.lower()) for word in target_words]
+            if None not in rows:
+                self.matrix, self.rows = matrix, np.array(rows, dtype=np.intp)
+
+    def get(self, guess: str, targets: np.ndarray) -> np.ndarray:
+        if self.matrix is not None and guess.lower() in self.matrix.column_index:
+            return self.matrix.values[self.rows[targets], self.matrix.column(guess)]
+        return pattern.build_outcome_matrix(
+            [self.target_words[t] for t in targets], [guess]
+        )[:, 0]
@@ -1,20 +1,158 @@
 from __future__ import annotations
 
+import contextlib
 import functools
+import hashlib
 import pickle
+import shutil
+import tempfile
+import threading
 from collections import defaultdict
-from dataclasses import dataclass
 from multiprocessing import Pool
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
 
 import numpy as np
-import pandas as pd
-from tqdm.notebook import trange
 
 from wordle import game as game_module
+from wordle import instrument, load, pattern, valid
+from wordle.player import matrix_cache
+from wordle.player.solver_cache import SolverCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# the outcome histograms of all candidates are computed in chunks of columns holding
+# about this many (solution, candidate) or (candidate, outcome) cells, to bound the size
+# of temporary arrays whatever the number of outcome codes (3 ** word_length).
+_HISTOGRAM_CHUNK_CELLS = 1 << 22
+
+_SHARED_MEMORY_DIR = "/dev/shm" if Path("/dev/shm").is_dir() else None
+
+# guards the temporary exports of outcome matrices (cf. `PatternMatrix.memory_mapped`)
+_EXPORT_LOCK = threading.Lock()
+
+# a filtered map is compacted into its own contiguous block of rows when it keeps at
+# most 1 / _COMPACTION_RATIO of the rows of the block it was filtered from.
+_COMPACTION_RATIO = 4
+
+# a map keeps the outcome histograms of its candidates (cf. `candidate_histograms`) when
+# it has at least as many solutions as outcome codes (smaller maps recompute them faster
+# than they would update them), and when they hold at most this many cells.
+_HISTOGRAM_TABLE_CELLS = 1 << 23
+
+# partitions of at most sqrt(_PAIRWISE_RATIO * n_outcomes) solutions count matching
+# outcomes pairwise, which is cheaper than filling (mostly empty) outcome histograms.
+_PAIRWISE_RATIO = 8
+
+
+class PatternMatrix:
+    """outcome matrix shared by a `PossibleSolutionsMap` and all the maps filtered from it.
+
+    attributes:
+        values: a (n_solutions, n_allowed) array of outcome codes, of
+            `pattern.outcome_dtype(word_length)` (possibly memory-mapped, None
+            until the map is built) where `values[i, j]` is the outcome of guessing
+            `allowed_words[j]` if the solution is `solutions[i]` (cf. `GuessOutcome.uint8`)
+        solutions: the words associated to each row
+        allowed_words: the words associated to each column
+        path: the `matrix_cache` directory the values are memory-mapped from, if any
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        solutions: list[str],
+        allowed_words: list[str],
+        path: Path = None,
+    ):
+        self.values = values
+        self.solutions = list(solutions)
+        self.allowed_words = list(allowed_words)
+        self.path = path
+        # temporary export of the matrix, and the number of contexts using it
+        self._export_dir: Path = None
+        self._export_users = 0
+
+    @functools.cached_property
+    def column_index(self) -> dict[str, int]:
+        return {word.lower(): i for i, word in enumerate(self.allowed_words)}
+
+    @functools.cached_property
+    def row_index(self) -> dict[str, int]:
+        return {word.lower(): i for i, word in enumerate(self.solutions)}
+
+    @functools.cached_property
+    def constraints_index(self) -> valid.WordConstraintsIndex:
+        """letter counts and positions of the allowed words (cf. hard mode)."""
+        return valid.WordConstraintsIndex(self.allowed_words)
+
+    def column(self, word: str) -> int:
+        """returns the column index of an allowed word."""
+        return self.column_index[word.lower()]
+
+    @property
+    def word_length(self) -> int:
+        return len(self.allowed_words[0])
+
+    @property
+    def n_outcomes(self) -> int:
+        return 3**self.word_length
+
+    @classmethod
+    def from_cache(cls, directory: Path) -> PatternMatrix:
+        values, solutions, allowed_words = matrix_cache.open_matrix(directory)
+        return cls(values, solutions, allowed_words, path=Path(directory))
+
+    @contextlib.contextmanager
+    def memory_mapped(self) -> Iterator[PatternMatrix]:
+        """makes the matrix shareable with other processes for the duration of the context.
+
+        a matrix loaded from a `matrix_cache` entry is pickled as its path, so that
+        unpickling it (e.g. in a worker process) memory-maps the same file. other matrices
+        are written to a cache entry, in shared memory (`/dev/shm`) when available, which
+        is shared by all the contexts open at once (e.g. in several threads) and removed
+        when the last one exits."""
+        with _EXPORT_LOCK:
+            if self.path is None:
+                tmp_dir = Path(
+                    tempfile.mkdtemp(dir=_SHARED_MEMORY_DIR, prefix="wordle-")
+                )
+                try:
+                    matrix_cache.save_matrix(
+                        tmp_dir / "matrix",
+                        self.values,
+                        self.solutions,
+                        self.allowed_words,
+                    )
+                except BaseException:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    raise
+                self.path, self._export_dir = tmp_dir / "matrix", tmp_dir
+            exported = self._export_dir is not None
+            if exported:
+                self._export_users += 1
+        try:
+            yield self
+        finally:
+            if exported:
+                with _EXPORT_LOCK:
+                    self._export_users -= 1
+                    if self._export_users == 0:
+                        shutil.rmtree(self._export_dir, ignore_errors=True)
+                        self.path, self._export_dir = None, None
+
+    def __reduce_ex__(self, protocol):
+        if self.path is not None:
+            return (PatternMatrix.from_cache, (self.path,))
+        return super().__reduce_ex__(protocol)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("constraints_index", None)  # cheap to rebuild
+        return state
 
 
-@dataclass
 class PossibleSolutionsMap:
     def __init__(self, possible_solutions: dict[str, float], allowed_words: list[str]):
         """
@@ -28,60 +166,363 @@ class PossibleSolutionsMap:
                 an actual solution. the DataFrame will have the keys of `possible_solutions` as index and
                 `allowed_words` as columns. Values will be shorform (e.g. "CO__C", cf. `game.GuessOutcome`)
             entropy: evaluates the amount of remaining uncertainty given the remaining possible_solutions
+
+        internally, the outcomes are stored in a `PatternMatrix` shared by all the maps
+        filtered from this one. each map only keeps the (integer) indices of the rows that
+        are still possible solutions.
+        """
+        possible_solutions = dict(possible_solutions)
+        solutions = list(possible_solutions.keys())
+        self._set_state(
+            PatternMatrix(None, solutions, allowed_words),
+            np.array(list(possible_solutions.values()), dtype=np.float64),
+            block=None,
+            block_rows=np.arange(len(solutions)),
+        )
+
+    def _set_state(
+        self,
+        matrix: PatternMatrix,
+        weights: np.ndarray,
+        block: np.ndarray,
+        block_rows: np.ndarray,
+        positions: np.ndarray = None,
+        weights_version: bytes = None,
+        hard_mode: bool = False,
+        columns: np.ndarray = None,
+    ) -> None:
+        """
+        args:
+            matrix: the shared outcome matrix
+            weights: the prior weight of each row of `matrix`
+            block: an array of outcomes rows, either `matrix.values` or a compacted copy
+                of a subset of its rows
+            block_rows: the `matrix` row index of each row in `block`
+            positions: the rows of `block` that are still possible solutions (all of them
+                if None)
+            weights_version: a digest of `weights` (computed if None)
+            hard_mode: whether filtering the map narrows its candidate guesses
+            columns: the columns of the candidate guesses (all of them if None)
         """
-        self.possible_solutions = pd.Series(possible_solutions)
-        self.n_solutions: int = len(possible_solutions)
-        self.allowed_words = allowed_words
-        self.n_allowed = len(allowed_words)
+        self._matrix = matrix
+        self._weights = weights
+        self._weights_version = weights_version or _digest(weights.tobytes())
+        self._state_id = None
+        self._block = block
+        self._block_rows = block_rows
+        self._positions = positions
+        self.hard_mode = hard_mode
+        self._columns = columns
+        self._histograms = None
+        # (parent map, removed solutions) to derive the histograms from the parent's ones
+        self._histograms_source = None
+        self.allowed_words = matrix.allowed_words
+        self.n_allowed = len(matrix.allowed_words)
 
     def build_map(self):
         """pre-computes guess outcome between all allowed words and all possible solutions.
-        the result is stored in a pandas DataFrame with uint8 outcome values, allowed words as column names
+        the result is stored in a pandas DataFrame with integer outcome values, allowed words as column names
         and possible solutions as index values.
         results are stored in `self.map`"""
+        solutions, allowed_words = self.solutions, list(self.allowed_words)
+        values = pattern.build_outcome_matrix(solutions, allowed_words)
+        self._set_state(
+            PatternMatrix(values, solutions, allowed_words),
+            self.weights,
+            block=values,
+            block_rows=np.arange(len(solutions)),
+        )
 
-        numpy_map = np.empty(
-            (self.n_solutions, len(self.allowed_words)),
-            dtype=np.uint8,
+    @classmethod
+    def from_map(cls, map: pd.DataFrame, possible_solutions: dict[str, float]):
+        assert set(possible_solutions.keys()) == set(map.index)
+        values = np.ascontiguousarray(
+            map.to_numpy(dtype=pattern.outcome_dtype(len(map.columns[0])))
+        )
+        return cls._from_matrix(
+            PatternMatrix(values, list(map.index), list(map.columns)),
+            possible_solutions,
         )
-        for i in trange(self.n_solutions):
-            solution = self.possible_solutions.index[i]
-            game = game_module.WordleGame(solution)
 
-            def _eval_guess_word(guess_word):
-                return game.evaluate_guess(guess_word).uint8
+    @classmethod
+    def _from_matrix(
+        cls, matrix: PatternMatrix, possible_solutions: dict[str, float]
+    ) -> PossibleSolutionsMap:
+        psm = cls.__new__(cls)
+        possible_solutions = dict(possible_solutions)
+        weights = np.array(
+            [possible_solutions[word] for word in matrix.solutions], dtype=np.float64
+        )
+        psm._set_state(
+            matrix,
+            weights,
+            block=matrix.values,
+            block_rows=np.arange(len(matrix.solutions)),
+        )
+        return psm
 
-            numpy_map[i, :] = list(map(_eval_guess_word, self.allowed_words))
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        if self._block is self._matrix.values:
+            # restored from the (possibly memory-mapped) matrix instead of copied
+            state["_block"] = None
+        # recomputed on demand, instead of copying them (and the parent map)
+        state["_histograms"] = state["_histograms_source"] = None
+        return state
 
-        self.map = pd.DataFrame(
-            numpy_map,
-            index=self.possible_solutions.index,
-            columns=self.allowed_words,
-        )
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self._block is None:
+            self._block = self._matrix.values
 
-    @classmethod
-    def from_map(cls, map: pd.DataFrame, possible_solutions: dict[str, float]):
-        assert set(possible_solutions.keys()) == set(map.index)
-        psm = cls(possible_solutions, allowed_words=map.columns)
-        psm.map = map
+    @property
+    def pattern_matrix(self) -> PatternMatrix:
+        return self._matrix
+
+    @property
+    def rows(self) -> np.ndarray:
+        """row indices (in the shared outcome matrix) of the remaining possible solutions."""
+        if self._positions is None:
+            return self._block_rows
+        return self._block_rows[self._positions]
+
+    @property
+    def n_solutions(self) -> int:
+        return len(self.rows)
+
+    @property
+    def solutions(self) -> list[str]:
+        return [self._matrix.solutions[row] for row in self.rows]
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._weights[self.rows]
+
+    @property
+    def outcomes(self) -> np.ndarray:
+        """(n_solutions, n_allowed) outcomes for the remaining possible solutions."""
+        if self._positions is None:
+            return self._block
+        return self._block[self._positions]
+
+    @property
+    def n_outcomes(self) -> int:
+        return self._matrix.n_outcomes
+
+    def column_index(self, word: str) -> int:
+        return self._matrix.column(word)
+
+    @property
+    def candidate_columns(self) -> np.ndarray:
+        """columns of the allowed words that can be guessed next: all of them, unless
+        narrowed in hard mode."""
+        if self._columns is None:
+            return np.arange(self.n_allowed)
+        return self._columns
+
+    @property
+    def candidate_outcomes(self) -> np.ndarray:
+        """(n_solutions, n_candidates) outcomes of the candidate guesses (cf.
+        `candidate_columns`) for each remaining possible solution."""
+        if self._columns is None:
+            return self.outcomes
+        if self._positions is None:
+            return self._block[:, self._columns]
+        return self._block[np.ix_(self._positions, self._columns)]
+
+    def with_hard_mode(self) -> PossibleSolutionsMap:
+        """returns this map in hard mode: filtering it by a guess outcome also drops the
+        candidate guesses that don't use the hints revealed by the outcome (cf.
+        `WordleGame.check_hard_mode_guess`)."""
+        psm = self._from_positions(self._positions, self._columns)
+        psm.hard_mode = True
         return psm
 
+    def next_candidates(self, column: int, codes: np.ndarray) -> np.ndarray:
+        """for each outcome code in `codes` of the guess at index `column`, flags the
+        candidate guesses that can still be guessed after that outcome.
+
+        returns:
+            a (len(codes), n_candidates) boolean array, or None if the map is not in hard
+            mode (every candidate stays available)"""
+        if not self.hard_mode:
+            return None
+        index, columns = self._matrix.constraints_index, self.candidate_columns
+        return np.array(
+            [
+                index.mask(self._hints(column, code), rows=columns)
+                for code in np.asarray(codes).tolist()
+            ],
+            dtype=bool,
+        ).reshape(len(codes), len(columns))
+
+    def _hints(self, column: int, code: int) -> valid.LetterConstraints:
+        outcome = game_module.GuessOutcome(self.allowed_words[column], code)
+        return valid.LetterConstraints.from_hints([outcome], self._matrix.word_length)
+
+    def column_outcomes(self, column: int) -> np.ndarray:
+        """outcomes of the guess at index `column` for each remaining possible solution."""
+        if self._positions is None:
+            return self._block[:, column]
+        return self._block[self._positions, column]
+
+    @property
+    def possible_solutions(self) -> pd.Series:
+        import pandas as pd
+
+        return pd.Series(self.weights, index=self.solutions)
+
+    @property
+    def map(self) -> pd.DataFrame:
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.outcomes, index=self.solutions, columns=self.allowed_words, copy=False
+        )
+
     def filter_based_on_guess_outcome(
         self, guess_outcome: game_module.GuessOutcome
     ) -> PossibleSolutionsMap:
-        map = self.map.query(
-            f"`{guess_outcome.guess_word.lower()}`=={guess_outcome.uint8}"
+        return self.filter_by_outcome_code(
+            self.column_index(guess_outcome.guess_word), guess_outcome.uint8
         )
-        return PossibleSolutionsMap.from_map(
-            map=map, possible_solutions=self.possible_solutions[map.index]
+
+    def filter_by_outcome_code(self, column: int, code: int) -> PossibleSolutionsMap:
+        """keeps the possible solutions for which guessing the word at index `column`
+        results in the outcome `code`."""
+        with instrument.span("filter") as span:
+            psm = self._filter_by_outcome_code(column, code)
+            if instrument.enabled():
+                span.set(n_solutions=self.n_solutions, n_kept=psm.n_solutions)
+        return psm
+
+    def _filter_by_outcome_code(self, column: int, code: int) -> PossibleSolutionsMap:
+        matches = np.flatnonzero(self.column_outcomes(column) == code)
+        positions = matches if self._positions is None else self._positions[matches]
+        columns = self._columns
+        if self.hard_mode:
+            # only the candidates left are checked: the cost shrinks along the game
+            columns = self.candidate_columns[self.next_candidates(column, [code])[0]]
+        psm = self._from_positions(positions, columns)
+
+        n_removed = self.n_solutions - len(matches)
+        if self._histograms is not None and n_removed < len(matches):
+            removed = np.ones(self.n_solutions, dtype=bool)
+            removed[matches] = False
+            psm._histograms_source = (self, np.flatnonzero(removed))
+        return psm
+
+    def tracks_histograms(self) -> bool:
+        """whether the entropies of the candidates are computed from the histograms kept
+        (or derived) by this map (cf. `candidate_histograms`)."""
+        return (
+            self._histograms is not None
+            or self._histograms_source is not None
+            or (
+                self.n_solutions >= self.n_outcomes
+                and len(self.candidate_columns) * self.n_outcomes
+                <= _HISTOGRAM_TABLE_CELLS
+            )
         )
 
+    def candidate_histograms(self) -> np.ndarray:
+        """(n_candidates, n_outcomes) histograms of the outcomes of the candidate guesses
+        (cf. `outcome_histograms`): counts of remaining solutions if their weights are
+        equal, total weights otherwise.
+
+        maps with many solutions keep their histograms. a map filtered from one of them,
+        with fewer solutions removed than kept, derives its histograms by subtracting the
+        contributions of the removed solutions: the work scales with the change, rather
+        than with the remaining solutions."""
+        if self._histograms is not None:
+            return self._histograms
+
+        if self._histograms_source is not None:
+            parent, removed = self._histograms_source
+            histograms = parent._histograms_without(removed, self.candidate_columns)
+        else:
+            weights = self.weights
+            histograms = outcome_histograms(
+                self.candidate_outcomes,
+                None if weights.min() == weights.max() else weights,
+                self.n_outcomes,
+            )
+        self._histograms_source = None
+        if self.tracks_histograms():
+            self._histograms = histograms
+        return histograms
+
+    def _histograms_without(
+        self, removed: np.ndarray, columns: np.ndarray
+    ) -> np.ndarray:
+        """histograms of the candidates at `columns` (some of this map's candidates),
+        without the remaining solutions at index `removed`."""
+        histograms = self.candidate_histograms()
+        if len(columns) < len(self.candidate_columns):
+            histograms = histograms[np.searchsorted(self.candidate_columns, columns)]
+        positions = removed if self._positions is None else self._positions[removed]
+        removed_outcomes = self._block[positions]
+        if self._columns is not None or len(columns) < self.n_allowed:
+            removed_outcomes = removed_outcomes[:, columns]
+
+        weights = None
+        if not np.issubdtype(histograms.dtype, np.integer):
+            weights = self.weights[removed]
+        return histograms - outcome_histograms(
+            removed_outcomes, weights, self.n_outcomes
+        )
+
+    def subset(
+        self, rows: np.ndarray = None, columns: np.ndarray = None
+    ) -> PossibleSolutionsMap:
+        """a map of some of the remaining possible solutions, sharing this map's outcome
+        matrix and prior weights.
+
+        args:
+            rows: the rows (in the shared outcome matrix, cf. `rows`) of the solutions
+                kept, among the remaining ones (all of them if None: a copy of this map,
+                without the histograms it keeps)
+            columns: the columns of the candidate guesses (cf. `candidate_columns`),
+                those of this map if None"""
+        columns = self._columns if columns is None else np.asarray(columns)
+        if rows is None:
+            return self._from_positions(self._positions, columns)
+
+        rows = np.unique(rows)
+        if not np.isin(rows, self.rows).all():
+            raise ValueError("rows must be remaining solutions of the map")
+        return self._from_positions(np.searchsorted(self._block_rows, rows), columns)
+
+    def _from_positions(
+        self, positions: np.ndarray, columns: np.ndarray = None
+    ) -> PossibleSolutionsMap:
+        psm = PossibleSolutionsMap.__new__(PossibleSolutionsMap)
+        block, block_rows = self._block, self._block_rows
+        if positions is not None and len(positions) * _COMPACTION_RATIO <= len(
+            block_rows
+        ):
+            # copying a small subset into a contiguous block is cheap, and avoids
+            # gathering rows from the (much larger) parent block at every later step.
+            block, block_rows, positions = block[positions], block_rows[positions], None
+        psm._set_state(
+            self._matrix,
+            self._weights,
+            block,
+            block_rows,
+            positions,
+            weights_version=self._weights_version,
+            hard_mode=self.hard_mode,
+            columns=columns,
+        )
+        return psm
+
     @property
     def entropy(self) -> float:
         """measures the remaining level of uncertainty given the possible solutions left.
 
         Note: only depends on possible solutions"""
-        return self._words_freq_series_to_entropy(self.possible_solutions)
+        weights = self.weights
+        return histogram_entropies(weights[None], weights.sum())[0]
 
     def get_candidate_entropy(
         self: PossibleSolutionsMap, candidate_guess: str
@@ -89,21 +530,16 @@ class PossibleSolutionsMap:
         """calculates entropy for a given `candidate_guess`"""
         """expected bits of information to be gained from using this guess,
         given the possible solutions left."""
-        grouped_words = self.possible_solutions.groupby(
-            self.map.loc[:, candidate_guess]
-        ).sum()
-        return self._words_freq_series_to_entropy(grouped_words)
-
-    def _words_freq_series_to_entropy(self, wf: pd.Series) -> float:
-        # turn weights into probabilities
-        p = wf / self.possible_solutions.sum()
-        # apply entropy formula
-        return -(p * np.log2(p)).sum()
+        grouped_weights = np.bincount(
+            self.column_outcomes(self.column_index(candidate_guess)),
+            weights=self.weights,
+            minlength=self.n_outcomes,
+        )
+        return histogram_entropies(grouped_weights[None], self.weights.sum())[0]
 
     def to_pickle(self, path: Path):
         with open(path, "wb") as f:
             pickle.dump((self.map, self.possible_solutions), f)
-            pickle.dump(self.possible_solutions, f)
 
     @classmethod
     def from_pickle(cls, path: Path):
@@ -112,21 +548,527 @@ class PossibleSolutionsMap:
 
         return cls.from_map(m, ps)
 
+    def to_cache(self, directory: Path) -> None:
+        """stores the outcome matrix as a raw `.npy` file, with the possible solutions
+        and allowed words as sidecar files (cf. `matrix_cache`)."""
+        matrix_cache.save_matrix(
+            directory,
+            self.outcomes,
+            possible_solutions=self.solutions,
+            allowed_words=self.allowed_words,
+        )
+
+    @classmethod
+    def from_cache(
+        cls, directory: Path, possible_solutions: dict[str, float] = None
+    ) -> PossibleSolutionsMap:
+        """loads a map stored with `to_cache`. the outcome matrix is memory-mapped
+        (read-only), not copied.
+
+        args:
+            possible_solutions: optional `word / weight` prior. defaults to a weight of 1.0
+                for each solution stored in the cache."""
+        matrix = PatternMatrix.from_cache(directory)
+        if possible_solutions is None:
+            possible_solutions = {word: 1.0 for word in matrix.solutions}
+        return cls._from_matrix(matrix, possible_solutions)
+
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(n_solutions={self.n_solutions},n_allowed={self.n_allowed},entropy={self.entropy:.2f})"
+        hard_mode = (
+            f",n_candidates={len(self.candidate_columns)}" if self.hard_mode else ""
+        )
+        return f"{self.__class__.__name__}(n_solutions={self.n_solutions},n_allowed={self.n_allowed}{hard_mode},entropy={self.entropy:.2f})"
+
+    @property
+    def state_id(self) -> bytes:
+        """a compact id of the remaining possible solutions (and of their prior weights).
+
+        two maps filtered from the same starting map have the same id iff they have the
+        same remaining solutions, whatever the guesses that led to them (and, in hard
+        mode, the same candidate guesses)."""
+        if self._state_id is None:
+            remaining = np.zeros(len(self._matrix.solutions), dtype=bool)
+            remaining[self.rows] = True
+            content = np.packbits(remaining).tobytes() + self._weights_version
+            if self.hard_mode:
+                candidates = np.zeros(self.n_allowed, dtype=bool)
+                candidates[self.candidate_columns] = True
+                content += b"hard" + np.packbits(candidates).tobytes()
+            self._state_id = _digest(content)
+        return self._state_id
 
     def __hash__(self):
         """implementing a hashing strategy allows to use caching on functions calling
         a
         """
-        return hash(("".join(self.possible_solutions.keys())))
+        return hash(self.state_id)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PossibleSolutionsMap):
+            return NotImplemented
+        return self._matrix is other._matrix and self.state_id == other.state_id
+
+
+def _digest(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def load_or_build_map(
+    path_to_possible_words: Path,
+    path_to_allowed_words: Path,
+    cache_dir: Path = matrix_cache.DEFAULT_CACHE_DIR,
+) -> PossibleSolutionsMap:
+    """returns the map for the given word lists, reusing the cached outcome matrix when
+    one was already built from the same word list contents, and building (and caching)
+    it otherwise."""
+    directory = Path(cache_dir) / matrix_cache.cache_key(
+        path_to_possible_words, path_to_allowed_words
+    )
+    possible_solutions = load.load_words_as_dict(path_to_possible_words)
+
+    if not matrix_cache.is_cached(directory):
+        psm = PossibleSolutionsMap(
+            possible_solutions, load.load_words_as_list(path_to_allowed_words)
+        )
+        psm.build_map()
+        psm.to_cache(directory)
+
+    return PossibleSolutionsMap.from_cache(directory, possible_solutions)
+
+
+def outcome_histograms(
+    outcomes: np.ndarray, weights: np.ndarray, n_outcomes: int
+) -> np.ndarray:
+    """counts the outcomes of each candidate guess.
+
+    args:
+        outcomes: a (n_solutions, n_candidates) array of outcome codes
+        weights: the weight of each solution. if None, every solution counts for 1
+        n_outcomes: the number of possible outcome codes
+
+    returns:
+        a (n_candidates, n_outcomes) array where [j, o] is the total weight of the
+        solutions for which candidate j results in outcome o. the codes of each candidate
+        are offset by `j * n_outcomes`, so that a single `bincount` covers a whole chunk
+        of candidates."""
+    n_solutions, n_candidates = outcomes.shape
+    histograms = np.empty(
+        (n_candidates, n_outcomes), dtype=np.int64 if weights is None else np.float64
+    )
+    chunk_size = _histogram_chunk_size(n_solutions, n_outcomes)
+    offsets = np.arange(min(chunk_size, n_candidates), dtype=np.intp) * n_outcomes
+
+    for start in range(0, n_candidates, chunk_size):
+        chunk = outcomes[:, start : start + chunk_size]
+        width = chunk.shape[1]
+        binned = (chunk + offsets[:width]).ravel()
+        chunk_weights = None if weights is None else np.repeat(weights, width)
+        histograms[start : start + width] = np.bincount(
+            binned, weights=chunk_weights, minlength=width * n_outcomes
+        ).reshape(width, n_outcomes)
+
+    return histograms
+
+
+def candidate_entropies(
+    outcomes: np.ndarray, weights: np.ndarray, n_outcomes: int, total: float
+) -> np.ndarray:
+    """entropy of each candidate guess (column of `outcomes`), given the solutions (rows)
+    with the given `weights` (None if every solution counts for 1) summing up to `total`.
+
+    histograms are only computed for a chunk of candidates at a time: with long words,
+    the histograms of all candidates would take much more memory than the outcomes."""
+    n_solutions, n_candidates = outcomes.shape
+    chunk_size = _histogram_chunk_size(n_solutions, n_outcomes)
+    entropies = np.empty(n_candidates)
+    for start in range(0, n_candidates, chunk_size):
+        histograms = outcome_histograms(
+            outcomes[:, start : start + chunk_size], weights, n_outcomes
+        )
+        entropies[start : start + chunk_size] = histogram_entropies(histograms, total)
+    return entropies
+
+
+def _histogram_chunk_size(n_solutions: int, n_outcomes: int) -> int:
+    return max(1, _HISTOGRAM_CHUNK_CELLS // max(n_solutions, n_outcomes))
+
+
+def histogram_entropies(histograms: np.ndarray, total: float) -> np.ndarray:
+    """entropy of each row of `histograms` (counts or weights summing up to `total`)."""
+    if np.issubdtype(histograms.dtype, np.integer):
+        # p * log2(p) for every possible count, looked up instead of recomputed
+        p = np.arange(int(total) + 1) / total
+        plogp = np.zeros_like(p)
+        plogp[1:] = p[1:] * np.log2(p[1:])
+        return -plogp[histograms].sum(axis=1)
+
+    p = histograms / total
+    plogp = np.zeros_like(p)
+    np.multiply(p, np.log2(p, where=p > 0, out=plogp), where=p > 0, out=plogp)
+    return -plogp.sum(axis=1)
+
+
+def compute_candidate_entropies(psm: PossibleSolutionsMap) -> np.ndarray:
+    """entropy of every candidate guess (in the order of `psm.candidate_columns`: all
+    the allowed words, in column order, unless narrowed in hard mode) given the
+    remaining solutions."""
+    n_candidates = len(psm.candidate_columns)
+    instrument.count("candidates_scored", n_candidates)
+    with instrument.span("candidate_entropies", n_candidates=n_candidates) as span:
+        if instrument.enabled():
+            span.set(n_solutions=psm.n_solutions)
+        return _compute_candidate_entropies(psm)
+
+
+def _compute_candidate_entropies(psm: PossibleSolutionsMap) -> np.ndarray:
+    weights = psm.weights
+    if psm.tracks_histograms():
+        histograms = psm.candidate_histograms()
+        if np.issubdtype(histograms.dtype, np.integer):
+            return histogram_entropies(histograms, total=len(weights))
+        return histogram_entropies(histograms, total=weights.sum())
+
+    outcomes = psm.candidate_outcomes
+    if weights.min() == weights.max():
+        # equal weights: plain counts give the same probabilities, and faster
+        return candidate_entropies(outcomes, None, psm.n_outcomes, total=len(weights))
+
+    return candidate_entropies(outcomes, weights, psm.n_outcomes, total=weights.sum())
+
+
+def board_candidate_entropies(psms: list[PossibleSolutionsMap]) -> np.ndarray:
+    """entropy of every allowed word (in column order) on each board of a multi-board
+    game, given the remaining solutions of each board (maps filtered from the same
+    starting map).
+
+    boards with few solutions left count matching outcomes pairwise, by groups of the
+    same size. the other boards are processed together: their remaining rows are
+    stacked, and their outcome codes offset by `board * n_outcomes`, so that a single
+    `bincount` per chunk of candidates fills the histograms of all of them.
+
+    returns:
+        a (n_boards, n_allowed) array"""
+    matrix = psms[0].pattern_matrix
+    n_outcomes, n_columns = matrix.n_outcomes, len(psms[0].allowed_words)
+    all_weights = np.zeros(len(matrix.solutions))
+    for psm in psms:
+        all_weights[psm.rows] = psm.weights
+    weights = np.concatenate([psm.weights for psm in psms])
+    equal_weights = weights.min() == weights.max()
+
+    entropies = np.empty((len(psms), n_columns))
+    sizes = np.array([psm.n_solutions for psm in psms])
+    small = sizes * sizes <= _PAIRWISE_RATIO * n_outcomes
+    for size in np.unique(sizes[small]):
+        boards = np.flatnonzero(small & (sizes == size))
+        entropies[boards] = _small_partition_entropies(
+            matrix.values,
+            np.stack([psms[b].rows for b in boards]),
+            None if equal_weights else all_weights,
+        )
+
+    large = np.flatnonzero(~small)
+    if len(large):
+        entropies[large] = _stacked_board_entropies(
+            matrix, [psms[b] for b in large], equal_weights
+        )
+    return entropies
+
+
+def _stacked_board_entropies(
+    matrix: PatternMatrix, psms: list[PossibleSolutionsMap], equal_weights: bool
+) -> np.ndarray:
+    n_outcomes, n_boards, n_columns = (
+        matrix.n_outcomes,
+        len(psms),
+        len(matrix.allowed_words),
+    )
+    rows = np.concatenate([psm.rows for psm in psms])
+    sizes = [psm.n_solutions for psm in psms]
+    boards = np.repeat(np.arange(n_boards), sizes)
+    weights = None if equal_weights else np.concatenate([psm.weights for psm in psms])
+    if weights is None:
+        # count solutions, with a lookup table of c * log2(c)
+        totals = np.array(sizes, dtype=np.float64)
+        counts = np.arange(max(sizes) + 1)
+        clogc = np.zeros(len(counts))
+        clogc[1:] = counts[1:] * np.log2(counts[1:])
+    else:
+        totals = np.bincount(boards, weights=weights, minlength=n_boards)
+
+    n_bins = n_boards * n_outcomes
+    chunk_size = _histogram_chunk_size(len(rows), n_bins)
+    offsets = (boards * n_outcomes)[:, None] + np.arange(
+        min(chunk_size, n_columns)
+    ) * n_bins
+    entropies = np.empty((n_boards, n_columns))
+
+    for start in range(0, n_columns, chunk_size):
+        chunk = matrix.values[rows, start : start + chunk_size]
+        width = chunk.shape[1]
+        binned = (chunk + offsets[:, :width]).ravel()
+        chunk_weights = None if weights is None else np.repeat(weights, width)
+        histograms = np.bincount(
+            binned, weights=chunk_weights, minlength=width * n_bins
+        ).reshape(width, n_boards, n_outcomes)
+        if weights is None:
+            c_log_c = clogc[histograms].sum(axis=2)
+        else:
+            c_log_c = np.zeros(histograms.shape)
+            np.multiply(
+                histograms,
+                np.log2(histograms, where=histograms > 0, out=c_log_c),
+                where=histograms > 0,
+                out=c_log_c,
+            )
+            c_log_c = c_log_c.sum(axis=2)
+        # H = log2(T) - sum(c * log2(c)) / T
+        entropies[:, start : start + width] = (np.log2(totals) - c_log_c / totals).T
+
+    return entropies
+
+
+def best_next_entropies(
+    psm: PossibleSolutionsMap, column: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """splits the remaining solutions by the outcome of the guess at index `column`.
+
+    returns:
+        the probability of each outcome that can occur (by increasing outcome code), and
+        the highest entropy a next (candidate) guess can achieve once that outcome is
+        known"""
+    weights = psm.weights
+    codes = psm.column_outcomes(column)
+    return partition_best_entropies(
+        psm.candidate_outcomes,
+        codes,
+        None if weights.min() == weights.max() else weights,
+        psm.n_outcomes,
+        psm.next_candidates(column, np.unique(codes)),
+    )
+
+
+def partition_best_entropies(
+    outcomes: np.ndarray,
+    codes: np.ndarray,
+    weights: np.ndarray,
+    n_outcomes: int,
+    candidates: np.ndarray = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """for each partition of the solutions (rows of `outcomes`) sharing the same code in
+    `codes`, the probability of the partition and the highest entropy of a candidate
+    (column of `outcomes`) restricted to the partition's solutions.
+
+    args:
+        candidates: an optional (n_partitions, n_candidates) boolean array flagging the
+            candidates that can be guessed in each partition (all of them if None)
+
+    the solutions are partitioned with a single sort. partitions of a given size are then
+    processed together: a single solution leaves no uncertainty, and small partitions
+    count matching outcomes pairwise instead of filling mostly empty histograms."""
+    with instrument.span("partition_best_entropies", n_solutions=len(codes)):
+        partitions = _Partitions(outcomes, codes, weights, n_outcomes, candidates)
+        best = np.zeros(len(partitions.sizes))
+        for refined, entropies in partitions.best_entropies():
+            best[refined] = entropies
+
+    return partitions.probabilities, best
+
+
+def expected_best_next_entropy(
+    outcomes: np.ndarray,
+    codes: np.ndarray,
+    weights: np.ndarray,
+    n_outcomes: int,
+    at_least: float = -np.inf,
+    candidates: np.ndarray = None,
+) -> tuple[float, bool]:
+    """expected highest entropy of a candidate once the code in `codes` is known (cf.
+    `partition_best_entropies`), and whether it is exact.
+
+    the computation stops as soon as the result is proven to be lower than `at_least`:
+    the returned value is then only an upper bound (lower than `at_least`). the entropy
+    of a partition bounds the entropy of any candidate restricted to it, so every
+    partition starts at that bound, and partitions are refined (largest first) until the
+    bound falls below `at_least` or every partition is exact."""
+    with instrument.span("expected_best_next_entropy", n_solutions=len(codes)):
+        partitions = _Partitions(outcomes, codes, weights, n_outcomes, candidates)
+        best = partitions.entropies()
+        expected = partitions.probabilities @ best
+        if expected < at_least:
+            return float(expected), False
+
+        # the bound is checked as soon as a refinement is applied: the next one is only
+        # computed if it is still needed
+        for refined, entropies in partitions.best_entropies():
+            best[refined] = entropies
+            expected = partitions.probabilities @ best
+            if expected < at_least:
+                return float(expected), False
+
+        return float(expected), True
+
+
+class _Partitions:
+    """the solutions (rows of `outcomes`) grouped by code, by increasing code."""
+
+    def __init__(
+        self,
+        outcomes: np.ndarray,
+        codes: np.ndarray,
+        weights: np.ndarray,
+        n_outcomes: int,
+        candidates: np.ndarray = None,
+    ):
+        self.outcomes = outcomes
+        self.weights = weights
+        self.n_outcomes = n_outcomes
+        self.candidates = candidates
+        self.order = np.argsort(codes, kind="stable")
+        sizes = np.bincount(codes)
+        self.sizes = sizes[sizes > 0]
+        self.starts = np.cumsum(self.sizes) - self.sizes
+        self.sorted_weights = (
+            np.ones(len(codes)) if weights is None else weights[self.order]
+        )
+        self.totals = np.add.reduceat(self.sorted_weights, self.starts)
+        self.probabilities = self.totals / self.totals.sum()
+
+    def entropies(self) -> np.ndarray:
+        """entropy of the solutions of each partition."""
+        if self.weights is None:
+            return np.log2(self.sizes)
+        w_log_w = self.sorted_weights * np.log2(self.sorted_weights)
+        return (
+            np.log2(self.totals) - np.add.reduceat(w_log_w, self.starts) / self.totals
+        )
+
+    def best_entropies(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """yields partitions and their highest candidate entropy, largest partitions
+        first: large partitions one by one, smaller ones by groups of the same size."""
+        for size in np.unique(self.sizes[self.sizes > 1])[::-1]:
+            partitions = np.flatnonzero(self.sizes == size)
+            instrument.count(
+                "candidates_scored", len(partitions) * self.outcomes.shape[1]
+            )
+            rows = self.order[self.starts[partitions, None] + np.arange(size)]
+            if size * size <= _PAIRWISE_RATIO * self.n_outcomes:
+                entropies = _small_partition_entropies(
+                    self.outcomes, rows, self.weights
+                )
+                yield partitions, self._best(entropies, partitions)
+                continue
+            for partition, partition_rows in zip(partitions, rows):
+                weights = None if self.weights is None else self.weights[partition_rows]
+                entropies = candidate_entropies(
+                    self.outcomes[partition_rows],
+                    weights,
+                    self.n_outcomes,
+                    self.totals[partition],
+                )
+                yield partition, self._best(entropies[None], partition)[0]
+
+    def _best(self, entropies: np.ndarray, partitions: np.ndarray) -> np.ndarray:
+        """highest entropy of the candidates of each partition (rows of `entropies`)."""
+        if self.candidates is None:
+            return entropies.max(axis=1)
+        return np.max(entropies, axis=1, where=self.candidates[partitions], initial=0.0)
+
+
+def subset_candidate_entropies(
+    outcomes: np.ndarray, rows: np.ndarray, weights: np.ndarray, n_outcomes: int
+) -> np.ndarray:
+    """entropy of every candidate (column of `outcomes`) given the solutions in `rows`.
+
+    args:
+        weights: the weight of each row of `outcomes`. if None, every solution counts for 1
+    """
+    instrument.count("candidates_scored", outcomes.shape[1])
+    if len(rows) * len(rows) <= _PAIRWISE_RATIO * n_outcomes:
+        return _small_partition_entropies(outcomes, rows[None], weights)[0]
+
+    subset_weights = None if weights is None else weights[rows]
+    total = len(rows) if weights is None else subset_weights.sum()
+    return candidate_entropies(outcomes[rows], subset_weights, n_outcomes, total)
+
+
+def _small_partition_entropies(
+    outcomes: np.ndarray, rows: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """(n_partitions, n_candidates) entropies of the candidates for each partition of
+    solutions in `rows` (n_partitions, size).
+
+    with c_i the total weight of the solutions sharing solution i's outcome, the entropy
+    of a candidate is log2(total) - sum_i(w_i * log2(c_i)) / total."""
+    n_partitions, size = rows.shape
+    chunk_size = max(1, _HISTOGRAM_CHUNK_CELLS // (size * outcomes.shape[1]))
+    entropies = np.empty((n_partitions, outcomes.shape[1]))
+
+    for start in range(0, n_partitions, chunk_size):
+        chunk_rows = rows[start : start + chunk_size]
+        chunk = outcomes[chunk_rows]  # (n_partitions, size, n_candidates)
+        if weights is None:
+            counts = np.zeros(chunk.shape, dtype=np.int16)
+            for i in range(size):
+                counts += chunk == chunk[:, i, None]
+            log_sums = np.log2(np.arange(1, size + 1))[counts - 1].sum(axis=1)
+            totals = np.full(len(chunk), float(size))
+        else:
+            chunk_weights = weights[chunk_rows]
+            counts = np.zeros(chunk.shape)
+            for i in range(size):
+                counts += (chunk == chunk[:, i, None]) * chunk_weights[:, i, None, None]
+            log_sums = np.einsum("ps,psc->pc", chunk_weights, np.log2(counts))
+            totals = chunk_weights.sum(axis=1)
+        entropies[start : start + chunk_size] = (
+            np.log2(totals)[:, None] - log_sums / totals[:, None]
+        )
+
+    return entropies
+
+
+def top_candidates(entropies: np.ndarray, k: int = None) -> np.ndarray:
+    """indices of the `k` highest entropies (all of them if None), sorted by decreasing
+    entropy. ties are broken by lowest index."""
+    if k is None or k >= len(entropies):
+        candidates = np.arange(len(entropies))
+    else:
+        # `argpartition` finds the k-th highest value without sorting everything. all the
+        # candidates tied with it are kept, so that ties are broken deterministically.
+        kth_highest = entropies[np.argpartition(-entropies, k - 1)[k - 1]]
+        candidates = np.flatnonzero(entropies >= kth_highest)
+
+    ranked = candidates[np.lexsort((candidates, -entropies[candidates]))]
+    return ranked[:k]
+
+
+def best_candidate(psm: PossibleSolutionsMap) -> str:
+    """the candidate with the highest entropy (the first of
+    `get_all_candidate_entropies`)."""
+    best = top_candidates(compute_candidate_entropies(psm), k=1)[0]
+    return psm.allowed_words[psm.candidate_columns[best]]
+
+
+def get_all_candidate_entropies(
+    psm: PossibleSolutionsMap, k: int = None, cache: SolverCache = None
+) -> pd.Series:
+    """entropies of the allowed words, sorted by decreasing values.
+
+    args:
+        k: only returns the k best candidates (all of them if None)
+        cache: if provided, results are looked up (and stored) in it, by state id"""
+    if cache is not None:
+        return cache.get_or_compute(
+            ("candidate_entropies", psm.state_id, k),
+            lambda: get_all_candidate_entropies(psm, k),
+        )
 
+    import pandas as pd
 
-@functools.lru_cache(maxsize=300)
-def get_all_candidate_entropies(psm: PossibleSolutionsMap) -> pd.Series:
-    return pd.Series(
-        {word: psm.get_candidate_entropy(word) for word in psm.map.columns}
-    ).sort_values(ascending=False)
+    entropies = compute_candidate_entropies(psm)
+    best = top_candidates(entropies, k)
+    columns = psm.candidate_columns[best]
+    return pd.Series(entropies[best], index=[psm.allowed_words[i] for i in columns])
 
 
 def print_candidate_entropies(entropies: pd.Series) -> None:
@@ -0,0 +1,83 @@
+"""content-addressed on-disk cache for the guess outcome matrix.
+
+a cache entry is a directory named after a hash of the word list files it was built
+from. it stores the raw outcome matrix as a `.npy` file, next to the ordered list of
+possible solutions (rows) and allowed words (columns). the matrix is opened with
+`np.memmap`, so that every process loading the same entry shares a single page-cache
+copy instead of deserializing its own.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from wordle import load
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "wordle"
+
+MATRIX_FNAME = "map.npy"
+POSSIBLE_SOLUTIONS_FNAME = "possible_solutions.txt"
+ALLOWED_WORDS_FNAME = "allowed_words.txt"
+
+
+def cache_key(path_to_possible_words: Path, path_to_allowed_words: Path) -> str:
+    """hashes the contents of both word list files (and the cache format version)."""
+    digest = hashlib.sha256(f"wordle-map-v{CACHE_FORMAT_VERSION}".encode())
+    for path in (path_to_possible_words, path_to_allowed_words):
+        content = Path(path).read_bytes()
+        digest.update(len(content).to_bytes(8, "little"))
+        digest.update(content)
+    return digest.hexdigest()[:24]
+
+
+def save_matrix(
+    directory: Path,
+    matrix: np.ndarray,
+    possible_solutions: list[str],
+    allowed_words: list[str],
+) -> None:
+    """writes a cache entry in `directory`.
+
+    the entry is first written in a temporary directory and then renamed, so that
+    concurrent readers never see a partially written entry."""
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=directory.parent, prefix=".tmp-"))
+    try:
+        tmp_dir.chmod(0o755)
+        np.save(tmp_dir / MATRIX_FNAME, np.ascontiguousarray(matrix))
+        _write_words(tmp_dir / POSSIBLE_SOLUTIONS_FNAME, possible_solutions)
+        _write_words(tmp_dir / ALLOWED_WORDS_FNAME, allowed_words)
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # another process may have written the same entry in the meantime
+        if not (directory / MATRIX_FNAME).exists():
+            raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def open_matrix(directory: Path) -> tuple[np.memmap, list[str], list[str]]:
+    """opens a cache entry, returns the read-only memory-mapped outcome matrix,
+    the possible solutions (rows) and the allowed words (columns)."""
+    directory = Path(directory)
+    matrix = np.load(directory / MATRIX_FNAME, mmap_mode="r")
+    possible_solutions = load.load_words_as_list(directory / POSSIBLE_SOLUTIONS_FNAME)
+    allowed_words = load.load_words_as_list(directory / ALLOWED_WORDS_FNAME)
+    return matrix, possible_solutions, allowed_words
+
+
+def is_cached(directory: Path) -> bool:
+    return (Path(directory) / MATRIX_FNAME).exists()
+
+
+def _write_words(path: Path, words: list[str]) -> None:
+    with open(path, "w") as f:
+        f.write("\n".join(words))
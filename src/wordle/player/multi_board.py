@@ -0,0 +1,129 @@
+"""plays multi-board games (e.g. Dordle, Quordle): one guess is scored on every board.
+
+the boards have independent solutions, so the information a guess brings on all the
+boards at once (the entropy of the joint outcome) is the sum of its entropies on each
+board. every board keeps its remaining solutions as a map filtered from the same
+starting map: all boards share a single outcome matrix, and only differ by their
+remaining rows.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from wordle.display.game import display_wordle_guess_outcome
+from wordle.game import GuessOutcome, MultiBoardGame
+from wordle.player import map
+from wordle.player.map import PossibleSolutionsMap
+from wordle.player.solver_cache import SolverCache
+
+
+@dataclass(frozen=True)
+class MultiBoardState:
+    """immutable state of a multi-board game, from a player's point of view.
+
+    attributes:
+        boards: the remaining possible solutions of each board (None once solved)
+        history: the outcomes of each guess made so far, on each board (None for boards
+            already solved)
+    """
+
+    boards: tuple[PossibleSolutionsMap | None, ...]
+    history: tuple[tuple[GuessOutcome | None, ...], ...] = ()
+
+    def advance(self, guess_outcomes: list[GuessOutcome | None]) -> MultiBoardState:
+        """returns the state following the outcomes of a guess on each board."""
+        return MultiBoardState(
+            tuple(
+                (
+                    None
+                    if outcome is None
+                    or outcome.uint8 == 3 ** len(outcome.guess_word) - 1
+                    else psm.filter_based_on_guess_outcome(outcome)
+                )
+                for psm, outcome in zip(self.boards, guess_outcomes)
+            ),
+            self.history + (tuple(guess_outcomes),),
+        )
+
+    @property
+    def unsolved_boards(self) -> list[PossibleSolutionsMap]:
+        return [psm for psm in self.boards if psm is not None]
+
+    @property
+    def number_of_guesses(self) -> int:
+        return len(self.history)
+
+
+class MultiBoardPlayer:
+    """picks the guess bringing the most information on all the unsolved boards: the
+    highest sum of entropies (cf. `map.board_candidate_entropies`). a board left with a
+    single possible solution is solved first.
+
+    args:
+        n_boards: number of boards of the games played
+        cache: caches the best guess for each state seen by this player (a new cache
+            holding up to 300 states by default)
+    """
+
+    def __init__(
+        self,
+        starting_psm: PossibleSolutionsMap,
+        n_boards: int = 4,
+        cache: SolverCache = None,
+    ):
+        self.starting_psm = starting_psm
+        self.n_boards = n_boards
+        self.cache = cache if cache is not None else SolverCache(max_entries=300)
+
+    def initial_state(self) -> MultiBoardState:
+        return MultiBoardState((self.starting_psm,) * self.n_boards)
+
+    def choose_guess(self, state: MultiBoardState) -> str:
+        boards = state.unsolved_boards
+        for psm in boards:
+            if psm.n_solutions == 1:
+                return psm.solutions[0]
+
+        # solved boards drop out, and the order of the boards doesn't matter
+        state_ids = tuple(sorted(psm.state_id for psm in boards))
+        return self.cache.get_or_compute(
+            ("multi_board_guess",) + state_ids, lambda: self._best_guess(boards)
+        )
+
+    def advance(
+        self, state: MultiBoardState, guess_outcomes: list[GuessOutcome | None]
+    ) -> MultiBoardState:
+        return state.advance(guess_outcomes)
+
+    def _best_guess(self, boards: list[PossibleSolutionsMap]) -> str:
+        # boards in the same state (e.g. before the first guess) are scored once
+        unique_boards = {psm.state_id: psm for psm in boards}
+        multiplicities = np.array(
+            [
+                sum(psm.state_id == state_id for psm in boards)
+                for state_id in unique_boards
+            ]
+        )
+        entropies = multiplicities @ map.board_candidate_entropies(
+            list(unique_boards.values())
+        )
+        return self.starting_psm.allowed_words[map.top_candidates(entropies, k=1)[0]]
+
+
+def play_multi_board_game(
+    player: MultiBoardPlayer, game: MultiBoardGame, quiet: bool = False
+) -> MultiBoardGame:
+    state = player.initial_state()
+    while not game.is_over:
+        guess = player.choose_guess(state)
+        outcomes = game.record_player_guess(guess)
+        state = player.advance(state, outcomes)
+        if not quiet:
+            for outcome in outcomes:
+                if outcome is not None:
+                    display_wordle_guess_outcome(outcome)
+
+    return game
@@ -0,0 +1,266 @@
+"""search for the strategy minimizing the expected number of guesses.
+
+the expected number of guesses needed from a set of remaining solutions S is
+    E(S) = 1 + sum_b p(b) * E(S_b)
+for the best guess, where S_b are the solutions sharing the same outcome b of the guess
+(the solution guessed right needs no further guess). the search is exhaustive over a
+restricted set of candidate guesses (the best ones by entropy), with:
+    - memoization: results are cached by remaining solutions (a digest of their sorted
+        rows) and remaining number of guesses, in a bounded `SolverCache`
+    - lower bounds: a set of solutions can't be solved faster than guessing the most
+        likely solution first, then at most n_outcomes - 1 of the others at the second
+        guess, (n_outcomes - 1) ** 2 of them at the third guess, and so on. a candidate
+        guess is dropped as soon as its lower bound can't beat the best guess found so far
+    - a time budget: once it is exhausted, only the best candidate by entropy is
+        explored, so that the search completes quickly (without guarantee of optimality).
+        results depending on such truncated searches aren't memoized
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from wordle.player import map
+from wordle.player.base import BasePlayer, GameState
+from wordle.player.map import PossibleSolutionsMap
+from wordle.player.solver_cache import SolverCache
+from wordle.player.tree import StrategyTree
+
+# improvements smaller than this are considered rounding errors: the first candidate
+# (by decreasing entropy) wins ties.
+_TOLERANCE = 1e-12
+
+
+class OptimalSolver:
+    """
+    args:
+        psm: the possible solutions (and outcome matrix) the strategy is searched for
+        top_k: number of candidate guesses explored in each state: the `top_k` allowed
+            words with the highest entropy, and the `top_k` remaining solutions with the
+            highest entropy
+        max_guesses: strategies needing more guesses to solve a game are discarded
+        memo: cache of the results of the search, by state (a new cache holding up to
+            1,000,000 states by default)
+        time_budget: maximum duration (in seconds) of each call to `solve` before
+            switching to the best candidate by entropy (no limit if None)
+        progress: if True, prints the expected number of guesses of each first guess
+            explored from the starting state
+
+    attributes:
+        timed_out: whether the time budget of the last call to `solve` was exhausted
+            before its result was found (the result may not be optimal)
+        n_states: number of states searched (not found in `memo`)
+    """
+
+    def __init__(
+        self,
+        psm: PossibleSolutionsMap,
+        top_k: int = 10,
+        max_guesses: int = 6,
+        memo: SolverCache = None,
+        time_budget: float = None,
+        progress: bool = False,
+    ):
+        self.psm = psm
+        self.top_k = top_k
+        self.max_guesses = max_guesses
+        self.memo = memo if memo is not None else SolverCache(max_entries=1_000_000)
+        self.time_budget = time_budget
+        self.progress = progress
+
+        # the matrix, rather than its values, is kept: it is pickled as its path when
+        # memory-mapped (cf. `PatternMatrix.memory_mapped`)
+        self._matrix = matrix = psm.pattern_matrix
+        self._n_outcomes = matrix.n_outcomes
+        self._solved_code = matrix.n_outcomes - 1
+        # weights of the rows of the outcome matrix (0 for rows filtered out of `psm`)
+        self._all_weights = np.zeros(len(matrix.solutions))
+        self._all_weights[psm.rows] = psm.weights
+        equal_weights = psm.weights.min() == psm.weights.max()
+        self._weights = None if equal_weights else self._all_weights
+        # column of each solution among the allowed words (-1 if it can't be guessed)
+        self._solution_columns = np.array(
+            [matrix.column_index.get(word.lower(), -1) for word in matrix.solutions]
+        )
+        # maximum number of solutions that can be solved with the i-th guess
+        self._guess_capacities = np.cumsum(
+            [(self._n_outcomes - 1) ** i for i in range(max_guesses)]
+        )
+
+        self._deadline = None
+        # number of states whose candidates were truncated by the time budget
+        self._n_truncated = 0
+        self.timed_out = False
+        self.n_states = 0
+
+    def solve(
+        self, psm: PossibleSolutionsMap = None, guesses_left: int = None
+    ) -> tuple[float, str]:
+        """returns the expected number of guesses needed to solve the game from `psm`
+        (the starting map by default), and the first guess of the strategy achieving it.
+        the expected number is infinite if no strategy (among the explored candidates)
+        solves all games within `guesses_left` guesses.
+
+        raises a `ValueError` if some of the possible solutions aren't allowed words: they
+        can't be guessed, so no strategy solves their games."""
+        psm = psm if psm is not None else self.psm
+        guesses_left = guesses_left if guesses_left is not None else self.max_guesses
+        unguessable = psm.rows[self._solution_columns[psm.rows] < 0]
+        if len(unguessable):
+            words = [self._matrix.solutions[row] for row in unguessable[:5]]
+            raise ValueError(
+                f"{len(unguessable)} possible solutions aren't allowed words, e.g. {words}"
+            )
+        if self.time_budget is not None:
+            self._deadline = time.monotonic() + self.time_budget
+        n_truncated = self._n_truncated
+        expected_guesses, column = self._solve(psm.rows.astype(np.int32), guesses_left)
+        self._deadline = None
+        self.timed_out = self._n_truncated > n_truncated
+        return expected_guesses, self.psm.allowed_words[column]
+
+    def strategy_tree(self, target_words: list[str] = None) -> StrategyTree:
+        """expands the strategy for all games whose solution is one of `target_words` (all
+        possible solutions by default)."""
+        target_words = target_words if target_words is not None else self.psm.solutions
+        return StrategyTree.from_player(
+            OptimalPlayer(self.psm, solver=self), target_words, self.max_guesses
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(top_k={self.top_k}, max_guesses={self.max_guesses}, n_states={self.n_states:,}, timed_out={self.timed_out}, memo={self.memo.stats})"
+
+    def _solve(self, rows: np.ndarray, guesses_left: int) -> tuple[float, int]:
+        weights = self._all_weights[rows]
+        if len(rows) == 1:
+            return 1.0, self._solution_columns[rows[0]]
+        if len(rows) == 2 or guesses_left == 1:
+            # guessing the most likely solution first is optimal for 2 solutions
+            column = self._solution_columns[rows[np.argmax(weights)]]
+            if guesses_left == 1:
+                return np.inf, column
+            return 2 - weights.max() / weights.sum(), column
+
+        key = (map._digest(rows.tobytes()), guesses_left)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+
+        self.n_states += 1
+        n_truncated = self._n_truncated
+        candidates = self._candidates(rows)
+        best = (np.inf, candidates[0])
+        for i, column in enumerate(candidates):
+            expected_guesses = self._expected_guesses(
+                rows, weights, column, guesses_left, best[0]
+            )
+            improved = expected_guesses < best[0] - _TOLERANCE
+            if improved:
+                best = (expected_guesses, column)
+            if self.progress and guesses_left == self.max_guesses:
+                # guesses that can't beat the best one are only evaluated up to a bound
+                print(
+                    f"{self.psm.allowed_words[column]} ({i + 1}/{len(candidates)}): {'' if improved else '>= '}{expected_guesses:.4f}"
+                )
+
+        if self._n_truncated == n_truncated:
+            self.memo.put(key, best)
+        return best
+
+    def _expected_guesses(
+        self,
+        rows: np.ndarray,
+        weights: np.ndarray,
+        column: int,
+        guesses_left: int,
+        at_most: float,
+    ) -> float:
+        """expected number of guesses when guessing the word at `column` from the
+        solutions in `rows`, or a lower bound of it (not lower than `at_most`) once it
+        is proven to be higher than `at_most`."""
+        codes = self._matrix.values[rows, column]
+        order = np.argsort(codes, kind="stable")
+        sizes = np.bincount(codes)
+        partition_codes = np.flatnonzero(sizes)
+        sizes = sizes[partition_codes]
+        if len(sizes) == 1 and partition_codes[0] != self._solved_code:
+            return np.inf  # the guess brings no information
+
+        starts = np.cumsum(sizes) - sizes
+        partitions = [
+            order[start : start + size]
+            for start, size, code in zip(starts, sizes, partition_codes)
+            if code != self._solved_code
+        ]
+        probabilities = np.array([weights[p].sum() for p in partitions]) / weights.sum()
+        lower_bounds = np.array([self._lower_bound(weights[p]) for p in partitions])
+
+        expected_guesses = 1 + probabilities @ lower_bounds
+        for i in np.argsort(-probabilities, kind="stable"):
+            if expected_guesses >= at_most - _TOLERANCE:
+                break
+            partition_guesses, _ = self._solve(rows[partitions[i]], guesses_left - 1)
+            expected_guesses += probabilities[i] * (partition_guesses - lower_bounds[i])
+
+        return expected_guesses
+
+    def _lower_bound(self, weights: np.ndarray) -> float:
+        """lower bound of the expected number of guesses to solve a game among solutions
+        with the given weights: the most likely solutions are solved first, within the
+        maximum number of solutions that can be solved with each guess."""
+        if len(weights) <= self._guess_capacities[1]:
+            return 2 - weights.max() / weights.sum()
+        ranks = np.arange(len(weights))
+        guesses = 1 + np.searchsorted(self._guess_capacities, ranks, side="right")
+        return np.sort(weights)[::-1] @ guesses / weights.sum()
+
+    def _candidates(self, rows: np.ndarray) -> np.ndarray:
+        """columns of the guesses explored from the solutions in `rows`, by decreasing
+        entropy."""
+        entropies = map.subset_candidate_entropies(
+            self._matrix.values, rows, self._weights, self._n_outcomes
+        )
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            self._n_truncated += 1
+            return map.top_candidates(entropies, 1)
+
+        # all remaining solutions can be guessed (cf. `solve`)
+        solution_columns = self._solution_columns[rows]
+        candidates = np.union1d(
+            map.top_candidates(entropies, self.top_k),
+            solution_columns[
+                map.top_candidates(entropies[solution_columns], self.top_k)
+            ],
+        )
+        return candidates[np.lexsort((candidates, -entropies[candidates]))]
+
+
+class OptimalPlayer(BasePlayer):
+    """plays the strategy found by an `OptimalSolver` (solving each new state on the fly).
+
+    args:
+        solver: the solver to use (a new `OptimalSolver` of `starting_psm`, with the
+            given keyword arguments, by default)
+    """
+
+    def __init__(
+        self,
+        starting_psm: PossibleSolutionsMap,
+        solver: OptimalSolver = None,
+        **solver_kwargs,
+    ):
+        self.starting_psm = starting_psm
+        self.solver = (
+            solver
+            if solver is not None
+            else OptimalSolver(starting_psm, **solver_kwargs)
+        )
+        self.cache = self.solver.memo
+
+    def choose_guess(self, state: GameState) -> str:
+        _, guess = self.solver.solve(
+            state.psm, self.solver.max_guesses - state.number_of_guesses
+        )
+        return guess
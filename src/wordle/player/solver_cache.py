@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from wordle import instrument
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(hits={self.hits:,}, misses={self.misses:,}, hit_rate={self.hit_rate:.1%}, evictions={self.evictions:,}, entries={self.entries:,}, nbytes={self.nbytes:,})"
+
+
+class SolverCache:
+    """least-recently-used cache for solver results (e.g. candidate entropies).
+
+    keys are expected to be built from `PossibleSolutionsMap.state_id`, so that identical
+    states reached through different guesses share the same entry. a cache is meant to be
+    owned by a player (its scope): state ids are only comparable between maps filtered from
+    the same starting map.
+
+    args:
+        max_entries: maximum number of cached results (no limit if None)
+        max_bytes: maximum estimated size of the cached results (no limit if None)
+    """
+
+    def __init__(self, max_entries: int = 300, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                instrument.count("cache_misses")
+                return default
+            self.hits += 1
+            instrument.count("cache_hits")
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        nbytes = _estimate_nbytes(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[1]
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """returns the cached value for `key`, computing (and caching) it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """empties the cache and resets its counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self.hits, self.misses, self.evictions, len(self._entries), self._nbytes
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(max_entries={self.max_entries}, max_bytes={self.max_bytes}, {self.stats})"
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+        ):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= nbytes
+            self.evictions += 1
+
+    def __getstate__(self) -> dict:
+        # locks can't be pickled: a copy (e.g. sent to a worker process) starts empty
+        return {"max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+
+_MISSING = object()
+
+
+def _estimate_nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "memory_usage"):  # pandas Series and DataFrames
+        return int(np.sum(value.memory_usage(index=True, deep=True)))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
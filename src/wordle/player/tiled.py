@@ -0,0 +1,202 @@
+"""out-of-core entropies, for dictionaries whose outcome matrix doesn't fit in memory.
+
+a `PossibleSolutionsMap` holds the outcomes of every (solution, guess) pair: 2,309 x
+12,953 codes take 30 MB, but 100,000 x 100,000 would take 10 GB. here, candidate guesses
+are processed by tiles of columns. the outcome codes of a tile are generated on the fly
+(or read from a memory-mapped matrix) by chunks of rows, and only their histograms are
+kept: the memory used is bounded by a budget, whatever the number of solutions and
+guesses. the best candidates of each tile are merged into a running top-k.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from wordle import pattern
+from wordle.game import GuessOutcome
+from wordle.player import map
+from wordle.player.base import Player
+from wordle.player.solver_cache import SolverCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+
+# codes are generated by chunks of about this many (solution, guess) pairs at most:
+# larger chunks are slower, as their temporary arrays no longer fit in the CPU caches.
+_CODES_CHUNK_CELLS = 1 << 17
+
+# approximate number of bytes of temporary arrays per (solution, guess) pair of a chunk,
+# while computing its codes and histograms.
+_BYTES_PER_CELL = 48
+
+# adding the histograms of a chunk costs as much as n_outcomes rows of codes: chunks hold
+# this many times more rows, so that it stays a fraction of the work.
+_ROWS_PER_OUTCOME = 4
+
+
+def tiled_candidate_entropies(
+    solutions: list[str],
+    guesses: list[str],
+    weights: np.ndarray = None,
+    k: int = 10,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    outcomes: np.ndarray = None,
+) -> pd.Series:
+    """the `k` best guesses by entropy (cf. `map.get_all_candidate_entropies`), computed
+    without the outcome matrix.
+
+    args:
+        weights: the weight of each solution (all equal if None)
+        k: number of best guesses returned (all of them if None)
+        memory_budget: approximate maximum number of bytes of temporary arrays
+        outcomes: an optional (n_solutions, n_guesses) outcome matrix, typically
+            memory-mapped (cf. `matrix_cache.open_matrix`): tiles are read from it
+            instead of computed
+
+    returns:
+        the entropies of the best guesses, sorted by decreasing values (ties are broken
+        by the order of `guesses`)"""
+    import pandas as pd
+
+    encoded_solutions = pattern.encode_words(solutions)
+    encoded_guesses = pattern.encode_words(guesses)
+    n_outcomes = 3 ** encoded_guesses.shape[1]
+    if weights is not None and weights.min() == weights.max():
+        weights = None
+    total = len(solutions) if weights is None else weights.sum()
+
+    tile_width, chunk_rows = _tile_shape(
+        len(solutions), n_outcomes, memory_budget, computed=outcomes is None
+    )
+    best_columns = np.empty(0, dtype=np.intp)
+    best_entropies = np.empty(0)
+
+    for start in range(0, len(guesses), tile_width):
+        columns = slice(start, start + tile_width)
+        histograms = 0
+        for row in range(0, len(solutions), chunk_rows):
+            rows = slice(row, row + chunk_rows)
+            if outcomes is not None:
+                codes = np.asarray(outcomes[rows, columns])
+            else:
+                codes = pattern.outcome_codes(
+                    encoded_solutions[rows], encoded_guesses[columns]
+                )
+            chunk_weights = None if weights is None else weights[rows]
+            histograms = histograms + map.outcome_histograms(
+                codes, chunk_weights, n_outcomes
+            )
+        entropies = map.histogram_entropies(histograms, total)
+
+        # the current best come first: ties keep the guesses of the earlier tiles
+        candidate_columns = np.concatenate(
+            [best_columns, start + np.arange(len(entropies))]
+        )
+        candidate_entropies = np.concatenate([best_entropies, entropies])
+        best = map.top_candidates(candidate_entropies, k)
+        best_columns, best_entropies = (
+            candidate_columns[best],
+            candidate_entropies[best],
+        )
+
+    return pd.Series(best_entropies, index=[guesses[c] for c in best_columns])
+
+
+def _tile_shape(
+    n_solutions: int, n_outcomes: int, memory_budget: int, computed: bool
+) -> tuple[int, int]:
+    """number of guesses per tile, and number of solutions per chunk of codes. half of
+    the budget holds the histograms of a tile (and the ones of a chunk being added), the
+    other half the temporary arrays of a chunk."""
+    chunk_cells = memory_budget // (2 * _BYTES_PER_CELL)
+    if computed:
+        chunk_cells = min(chunk_cells, _CODES_CHUNK_CELLS)
+    chunk_rows = max(1, min(n_solutions, _ROWS_PER_OUTCOME * n_outcomes))
+    tile_width = min(
+        memory_budget // (2 * 2 * n_outcomes * 8), chunk_cells // chunk_rows
+    )
+    return max(1, tile_width), chunk_rows
+
+
+@dataclass(frozen=True)
+class TiledState:
+    """state of a game played by a `TiledGreedyPlayer`.
+
+    attributes:
+        rows: indices of the remaining possible solutions
+        history: the outcomes of the guesses made so far
+    """
+
+    rows: np.ndarray
+    history: tuple[GuessOutcome, ...] = ()
+
+    @property
+    def number_of_guesses(self) -> int:
+        return len(self.history)
+
+    @property
+    def n_solutions(self) -> int:
+        """number of remaining possible solutions."""
+        return len(self.rows)
+
+
+class TiledGreedyPlayer(Player):
+    """plays the guess with the highest entropy, like `GreedyPlayer`, without building
+    the outcome matrix: entropies are computed by tiles (cf. `tiled_candidate_entropies`)
+    and the remaining solutions are filtered by computing the outcomes of each guess.
+
+    args:
+        possible_solutions: `word / weight` prior of the solutions
+        allowed_words: the words that can be guessed
+        memory_budget: approximate maximum number of bytes of temporary arrays
+        cache: caches the best guess for each state seen by this player (a new cache
+            holding up to 300 states by default)
+    """
+
+    def __init__(
+        self,
+        possible_solutions: dict[str, float],
+        allowed_words: list[str],
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        cache: SolverCache = None,
+    ):
+        self.solutions = list(possible_solutions)
+        self.weights = np.array(list(possible_solutions.values()), dtype=np.float64)
+        self.allowed_words = list(allowed_words)
+        self.memory_budget = memory_budget
+        self.cache = cache if cache is not None else SolverCache(max_entries=300)
+        self._encoded_solutions = pattern.encode_words(self.solutions)
+
+    def initial_state(self) -> TiledState:
+        return TiledState(np.arange(len(self.solutions)))
+
+    def choose_guess(self, state: TiledState) -> str:
+        if len(state.rows) <= 2:
+            return self.solutions[state.rows[0]]
+
+        key = map._digest(state.rows.tobytes())
+        return self.cache.get_or_compute(
+            ("tiled_guess", key),
+            lambda: tiled_candidate_entropies(
+                [self.solutions[row] for row in state.rows],
+                self.allowed_words,
+                self.weights[state.rows],
+                k=1,
+                memory_budget=self.memory_budget,
+            ).index[0],
+        )
+
+    def advance(self, state: TiledState, guess_outcome: GuessOutcome) -> TiledState:
+        codes = pattern.outcome_codes(
+            self._encoded_solutions[state.rows],
+            pattern.encode_words([guess_outcome.guess_word]),
+        )[:, 0]
+        return TiledState(
+            state.rows[codes == guess_outcome.uint8],
+            state.history + (guess_outcome,),
+        )
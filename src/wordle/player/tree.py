@@ -0,0 +1,178 @@
+"""strategy trees: the full decision tree of a deterministic player, expanded offline.
+
+a deterministic player always makes the same guess in the same state. expanding its
+decisions once for all the possible solutions gives a tree that can answer each move with
+a table lookup, however expensive the player that built it.
+
+the tree is stored as flat arrays (one row per node, children in CSR layout):
+    guesses: index (in `words`) of the guess made at each node
+    depths: number of guesses made before reaching each node
+    solves: whether the guess made at a node is the solution of one of its games
+    child_starts: the children of node `n` are edges `child_starts[n]:child_starts[n + 1]`
+    edge_codes: outcome code leading to each child, sorted for each node
+    edge_children: node reached through each edge
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from wordle import pattern
+from wordle.game import GuessOutcome
+from wordle.player import lockstep
+from wordle.player.base import Player
+
+
+class StrategyTree:
+    def __init__(
+        self,
+        words: list[str],
+        targets: list[str],
+        guesses: np.ndarray,
+        depths: np.ndarray,
+        solves: np.ndarray,
+        child_starts: np.ndarray,
+        edge_codes: np.ndarray,
+        edge_children: np.ndarray,
+        max_guesses: int = 6,
+    ):
+        self.words = words
+        self.targets = targets
+        self.guesses = guesses
+        self.depths = depths
+        self.solves = solves
+        self.child_starts = child_starts
+        self.edge_codes = edge_codes
+        self.edge_children = edge_children
+        self.max_guesses = max_guesses
+
+    @classmethod
+    def from_player(
+        cls, player: Player, target_words: list[str], max_guesses: int = 6
+    ) -> StrategyTree:
+        """expands all the decisions of a deterministic `player` for games whose solution
+        is one of `target_words`."""
+        decisions: list[lockstep.Decision] = []
+        lockstep.play_games_in_lockstep(
+            player, target_words, max_guesses, on_decision=decisions.append
+        )
+
+        words = sorted({decision.guess for decision in decisions})
+        word_index = {word: i for i, word in enumerate(words)}
+        guesses = np.array([word_index[d.guess] for d in decisions], dtype=np.int32)
+        depths = np.array([d.depth for d in decisions], dtype=np.uint8)
+        solves = np.array([d.guess in d.targets for d in decisions], dtype=bool)
+
+        # every decision but the first one is the child of an earlier decision
+        parents = np.array([d.parent_id for d in decisions[1:]], dtype=np.int32)
+        codes = np.array([d.code for d in decisions[1:]], dtype=np.int32)
+        children = np.arange(1, len(decisions), dtype=np.int32)
+        order = np.lexsort((codes, parents))
+        child_starts = np.zeros(len(decisions) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(parents, minlength=len(decisions)), out=child_starts[1:])
+
+        return cls(
+            words,
+            list(target_words),
+            guesses,
+            depths,
+            solves,
+            child_starts,
+            codes[order].astype(pattern.outcome_dtype(len(target_words[0]))),
+            children[order],
+            max_guesses,
+        )
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.guesses)
+
+    def guess(self, node: int) -> str:
+        return self.words[self.guesses[node]]
+
+    def child(self, node: int, code: int) -> int:
+        """returns the node reached from `node` when its guess has outcome `code`."""
+        start, end = self.child_starts[node], self.child_starts[node + 1]
+        i = start + np.searchsorted(self.edge_codes[start:end], code)
+        if i == end or self.edge_codes[i] != code:
+            raise KeyError(
+                f"no decision after guessing {self.guess(node)} with outcome {code}: was the solution one of the tree's targets?"
+            )
+        return int(self.edge_children[i])
+
+    def scores(self) -> dict[str, int]:
+        """the score of each target's game (cf. `WordleGame.score`), ordered as
+        `targets`."""
+        scores = dict.fromkeys(self.targets, 0)
+        for node in np.flatnonzero(self.solves):
+            scores[self.guess(node)] = self.max_guesses - int(self.depths[node])
+        return scores
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(n_nodes={self.n_nodes:,}, n_targets={len(self.targets):,}, max_depth={self.depths.max() + 1})"
+
+    def to_npz(self, path: Path) -> None:
+        np.savez(
+            path,
+            words=np.array(self.words),
+            targets=np.array(self.targets),
+            guesses=self.guesses,
+            depths=self.depths,
+            solves=self.solves,
+            child_starts=self.child_starts,
+            edge_codes=self.edge_codes,
+            edge_children=self.edge_children,
+            max_guesses=self.max_guesses,
+        )
+
+    @classmethod
+    def from_npz(cls, path: Path) -> StrategyTree:
+        with np.load(path) as arrays:
+            return cls(
+                arrays["words"].tolist(),
+                arrays["targets"].tolist(),
+                arrays["guesses"],
+                arrays["depths"],
+                arrays["solves"],
+                arrays["child_starts"],
+                arrays["edge_codes"],
+                arrays["edge_children"],
+                int(arrays["max_guesses"]),
+            )
+
+
+@dataclass(frozen=True)
+class TreeState:
+    """state of a game played by a `TreePlayer`: the current node of the tree."""
+
+    node: int = 0
+    history: tuple[GuessOutcome, ...] = ()
+
+    @property
+    def number_of_guesses(self) -> int:
+        return len(self.history)
+
+
+class TreePlayer(Player):
+    """plays the decisions recorded in a strategy tree."""
+
+    def __init__(self, tree: StrategyTree):
+        self.tree = tree
+
+    def initial_state(self) -> TreeState:
+        return TreeState()
+
+    def choose_guess(self, state: TreeState) -> str:
+        return self.tree.guess(state.node)
+
+    def advance(self, state: TreeState, guess_outcome: GuessOutcome) -> TreeState:
+        code = int(guess_outcome.uint8)
+        # a solved game has no next decision: it stays on its last node
+        solved = code == 3 ** len(guess_outcome.guess_word) - 1
+        return TreeState(
+            state.node if solved else self.tree.child(state.node, code),
+            state.history + (guess_outcome,),
+        )
@@ -1,78 +1,257 @@
-import functools
-from typing import Any
+from __future__ import annotations
 
-import pandas as pd
-from tqdm.notebook import tqdm
+import contextlib
+import multiprocessing
+import threading
+import warnings
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterator
+
+import numpy as np
 
 from wordle import game
-from wordle.player import base, map
-from wordle.player.base import Player
+from wordle.player import base, map, workers
+from wordle.player.base import BasePlayer, GameState
 from wordle.player.map import PossibleSolutionsMap, get_all_candidate_entropies
+from wordle.player.solver_cache import SolverCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# a candidate is only pruned if its two-step entropy is proven lower than the best one by
+# more than rounding errors, so that pruning never changes the selected guess.
+_PRUNING_TOLERANCE = 1e-9
+
+# candidates are only scored by worker processes when each worker gets at least this
+# many of them: otherwise dispatching them costs more than it saves.
+_MIN_CANDIDATES_PER_WORKER = 8
+
+# the candidate entropies cached for a state take up to ~1 MB (with the full dictionary
+# of allowed words as candidates): the cache is bounded by size as well.
+_DEFAULT_CACHE_BYTES = 256 * 2**20
+
 
+@dataclass(frozen=True)
+class TwoStepSearch:
+    """result of a branch-and-bound search for the best two-step guess.
 
-class TwoStepPlayer(Player):
+    attributes:
+        guess_word: the guess with the highest two-step entropy
+        entropy_total: its two-step entropy
+        n_candidates: the number of first guesses considered
+        n_pruned: the number of them skipped before their two-step entropy was known
+    """
+
+    guess_word: str
+    entropy_total: float
+    n_candidates: int
+    n_pruned: int
+
+
+class TwoStepPlayer(BasePlayer):
     def __init__(
         self,
         starting_psm: PossibleSolutionsMap,
         starting_guess: str = None,
         max_first_guesses: int = None,
+        cache: SolverCache = None,
+        prune: bool = False,
+        pool_size: int = 1,
+        hard_mode: bool = False,
     ):
-        self.starting_psm = starting_psm
+        """
+        args:
+            prune: if True, guesses are searched with `search_two_step_guess` instead of
+                computing the two-step entropies of all the `max_first_guesses` candidates
+            pool_size: number of worker processes scoring the step-two entropies of
+                candidate guesses (cf. `calculate_two_step_entropies`), when there are
+                enough of them. workers are started by the first decision that needs
+                them, and kept until `close` is called or the player is garbage
+                collected. they memory-map the outcome matrix instead of copying it.
+            cache: caches the best guess and the candidate entropies of each state the
+                player makes a decision in. the states of the two-step look-ahead
+                aren't cached: their entropies are computed all at once (cf.
+                `map.best_next_entropies`). a new cache holding up to 10,000 results,
+                or `_DEFAULT_CACHE_BYTES`, by default
+            hard_mode: if True, guesses use all the hints revealed so far, including the
+                best next guesses of the look-ahead (cf.
+                `PossibleSolutionsMap.with_hard_mode`)"""
+        self.starting_psm = starting_psm.with_hard_mode() if hard_mode else starting_psm
+        self.cache = (
+            cache
+            if cache is not None
+            else SolverCache(max_entries=10_000, max_bytes=_DEFAULT_CACHE_BYTES)
+        )
         self.starting_guess = starting_guess
+        self.prune = prune
+        self.pool_size = pool_size
         self.max_first_guesses = (
             max_first_guesses if max_first_guesses else starting_psm.n_allowed
         )
+        self._pool: multiprocessing.pool.Pool = None
+        self._close_pool: weakref.finalize = None
+        self._pool_lock = threading.Lock()
 
-        self.current_psm = starting_psm
-
-    def start_new_game(self) -> None:
-        self.current_psm = self.starting_psm
+    def close(self) -> None:
+        """stops the worker processes of the player, if any (new ones are started if it
+        keeps playing)."""
+        with self._pool_lock:
+            if self._close_pool is not None:
+                self._close_pool()
+            self._pool, self._close_pool = None, None
 
-    def update(self, guess_outcome: game.GuessOutcome) -> None:
-        self.current_psm = self.current_psm.filter_based_on_guess_outcome(guess_outcome)
+    def __getstate__(self) -> dict:
+        # worker processes stay with the original player: a copy starts its own if needed
+        state = self.__dict__.copy()
+        state["_pool"], state["_close_pool"] = None, None
+        del state["_pool_lock"]
+        return state
 
-        self.next_guess = guess_outcome.guess_word
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
 
-    def make_next_guess(self, game: game.WordleGame) -> str:
-        if (len(game.guesses_so_far) == 0) & (self.starting_guess is not None):
+    def choose_guess(self, state: GameState) -> str:
+        if (state.number_of_guesses == 0) & (self.starting_guess is not None):
             return self.starting_guess
 
-        if len(self.current_psm.possible_solutions) <= 2:
-            return self.current_psm.possible_solutions.index[0]
+        if state.psm.n_solutions <= 2:
+            return state.psm.solutions[0]
 
-        return self.find_guess_with_max_two_step_entropy()
+        return self.find_guess_with_max_two_step_entropy(state.psm)
 
-    @functools.lru_cache(maxsize=300)
-    def find_guess_with_max_two_step_entropy(self) -> str:
-        return self.calculate_two_step_entropies().index[0]
+    @property
+    def current_psm(self) -> PossibleSolutionsMap:
+        """remaining possible solutions of the game played with the legacy interface."""
+        return self.current_state.psm
 
-    def calculate_two_step_entropies(self, show_tqdm: bool = False) -> pd.DataFrame:
-        top_guesses_step_1 = get_all_candidate_entropies(self.current_psm).iloc[
-            : self.max_first_guesses
-        ]
+    def find_guess_with_max_two_step_entropy(
+        self, psm: PossibleSolutionsMap = None
+    ) -> str:
+        psm = psm if psm is not None else self.current_psm
+
+        def compute() -> str:
+            if self.prune:
+                return self.search_two_step_guess(psm).guess_word
+            return self.calculate_two_step_entropies(psm).index[0]
+
+        # both searches select the same guess: they can share cached results
+        return self.cache.get_or_compute(
+            ("two_step_guess", psm.state_id, self.max_first_guesses), compute
+        )
+
+    def search_two_step_guess(self, psm: PossibleSolutionsMap = None) -> TwoStepSearch:
+        """finds the guess with the highest two-step entropy, as ranked by
+        `calculate_two_step_entropies`, without computing every candidate's entropy.
+
+        candidates are processed by decreasing step-one entropy. the step-two entropy of a
+        candidate is refined from an upper bound, and the candidate is skipped as soon as
+        it can't beat the best two-step entropy found so far (cf.
+        `map.expected_best_next_entropy`)."""
+        psm = psm if psm is not None else self.current_psm
+        top_guesses_step_1 = get_all_candidate_entropies(
+            psm, k=self.max_first_guesses, cache=self.cache
+        )
+        outcomes, weights = psm.candidate_outcomes, psm.weights
+        if weights.min() == weights.max():
+            weights = None
+
+        best_guess, best_total, n_pruned = None, -np.inf, 0
+        for candidate_guess, entropy_step_1 in top_guesses_step_1.items():
+            column = psm.column_index(candidate_guess)
+            codes = psm.column_outcomes(column)
+            entropy_step_2, exact = map.expected_best_next_entropy(
+                outcomes,
+                codes,
+                weights,
+                psm.n_outcomes,
+                at_least=best_total - entropy_step_1 - _PRUNING_TOLERANCE,
+                candidates=psm.next_candidates(column, np.unique(codes)),
+            )
+            entropy_total = entropy_step_1 + entropy_step_2
+            if not exact:
+                n_pruned += 1
+            elif entropy_total > best_total:
+                best_guess, best_total = candidate_guess, entropy_total
+
+        return TwoStepSearch(best_guess, best_total, len(top_guesses_step_1), n_pruned)
+
+    def calculate_two_step_entropies(
+        self, psm: PossibleSolutionsMap = None, show_tqdm: bool = False
+    ) -> pd.DataFrame:
+        """
+        args:
+            psm: the remaining possible solutions (defaults to the ones of the game played
+                with the legacy interface)"""
+        psm = psm if psm is not None else self.current_psm
+        top_guesses_step_1 = get_all_candidate_entropies(
+            psm, k=self.max_first_guesses, cache=self.cache
+        )
         # get step 2 entropies for top guesses
         return self._calculate_step_two_entropies_for_guess_list(
-            top_guesses_step_1, show_tqdm=show_tqdm
+            psm, top_guesses_step_1, show_tqdm=show_tqdm
         )
 
     def _calculate_step_two_entropies_for_guess_list(
-        self, top_guesses_step_1: pd.Series, show_tqdm: bool = False
+        self,
+        psm: PossibleSolutionsMap,
+        top_guesses_step_1: pd.Series,
+        show_tqdm: bool = False,
     ) -> pd.DataFrame:
-        step_two_entropies = []
-        iterator = top_guesses_step_1.items()
+        candidate_guesses = list(top_guesses_step_1.index)
+        if self._fans_out(psm, candidate_guesses):
+            entropies_step_2 = _step_two_entropies_in_processes(
+                self._worker_pool(), psm, candidate_guesses, self.pool_size
+            )
+        else:
+            entropies_step_2 = (
+                self.get_step_two_entropy(guess, quiet=True, psm=psm)
+                for guess in candidate_guesses
+            )
+
+        iterator = zip(top_guesses_step_1.items(), entropies_step_2)
         if show_tqdm:
+            from tqdm.notebook import tqdm
+
             iterator = tqdm(iterator, total=len(top_guesses_step_1))
 
-        for candidate_guess, entropy_step_1 in iterator:
-            step_two_entropies.append(
-                self._get_two_steps_entropies(candidate_guess, entropy_step_1)
-            )
+        step_two_entropies = [
+            self._get_two_steps_entropies(guess, entropy_step_1, entropy_step_2)
+            for (guess, entropy_step_1), entropy_step_2 in iterator
+        ]
         return self._format_two_steps_entropies_to_df(step_two_entropies)
 
+    def _fans_out(self, psm: PossibleSolutionsMap, candidate_guesses: list) -> bool:
+        """whether the step-two entropies of the candidates are scored by workers."""
+        return (
+            self.pool_size > 1
+            # worker processes (e.g. of a parallel evaluation) can't start their own pool
+            and not multiprocessing.current_process().daemon
+            and len(candidate_guesses) >= _MIN_CANDIDATES_PER_WORKER * self.pool_size
+            # workers only hold the outcome matrix of the starting map
+            and psm.pattern_matrix is self.starting_psm.pattern_matrix
+        )
+
+    def _worker_pool(self) -> multiprocessing.pool.Pool:
+        with self._pool_lock:
+            if self._pool is None:
+                resources = contextlib.ExitStack()
+                with resources:
+                    self._pool = resources.enter_context(
+                        workers.process_pool(
+                            self.pool_size,
+                            self.starting_psm,
+                            self.starting_psm.pattern_matrix,
+                        )
+                    )
+                    # terminates the workers, then removes the exported matrix
+                    self._close_pool = weakref.finalize(self, resources.pop_all().close)
+            return self._pool
+
     def _get_two_steps_entropies(
-        self, candidate_guess: str, entropy_step_1: float
+        self, candidate_guess: str, entropy_step_1: float, entropy_step_2: float
     ) -> dict[str, Any]:
-        entropy_step_2 = self.get_step_two_entropy(candidate_guess, quiet=True)
         return {
             "guess_word": candidate_guess,
             "entropy_step_1": entropy_step_1,
@@ -83,60 +262,78 @@ class TwoStepPlayer(Player):
     def _format_two_steps_entropies_to_df(
         self, two_step_entropies: list[dict]
     ) -> pd.DataFrame:
+        import pandas as pd
+
         return (
             pd.DataFrame(two_step_entropies)
             .set_index("guess_word")
             .sort_values(["entropy_total", "entropy_step_1"], ascending=[False, False])
         )
 
-    def get_step_two_entropy(self, first_guess: str, quiet: bool = False) -> float:
-        """returns the entropy of the first guess, as well as the weighted average
-        of the entropy of the best next guess (for each possible outcome)."""
+    def get_step_two_entropy(
+        self, first_guess: str, quiet: bool = False, psm: PossibleSolutionsMap = None
+    ) -> float:
+        """returns the weighted average of the entropy of the best next guess, for each
+        possible outcome of `first_guess`.
 
-        outcome_probabilities = self._get_outcome_probabilities(first_guess)
-        entropy_step_2 = self._get_next_step_entropy(
-            first_guess, outcome_probabilities, quiet
-        )
+        all the outcomes are processed at once (cf. `map.best_next_entropies`): `quiet` is
+        only kept for backward compatibility."""
+        psm = psm if psm is not None else self.current_psm
+        return _step_two_entropy(psm, first_guess)
 
-        return entropy_step_2
 
-    def _get_next_step_entropy(
-        self, first_guess: str, outcome_probabilities: pd.Series, quiet: bool
-    ) -> float:
-        entropy_step_2 = 0
-        iterator = outcome_probabilities.items()
-        if not quiet:
-            iterator = tqdm(iterator, total=len(outcome_probabilities))
-
-        for uint8, prob in iterator:
-            (
-                best_next_word,
-                next_step_entropy,
-            ) = self._get_next_step_entropy_given_outcome(first_guess, uint8)
-            entropy_step_2 += prob * next_step_entropy
-
-        return entropy_step_2
-
-    def _get_outcome_probabilities(self, first_guess) -> pd.Series:
-        """counts how often each outcome can occur given the possible solutions defined in psm"""
-        outcome_counts = self.current_psm.map[first_guess].value_counts()
-        return outcome_counts / outcome_counts.sum()
-
-    def _get_next_step_entropy_given_outcome(self, first_guess, uint8):
-        outcome = game.GuessOutcome.from_uint8(first_guess, uint8)
-        psm_step2 = self.current_psm.filter_based_on_guess_outcome(outcome)
-
-        best_next_word, next_step_entropy = next(
-            get_all_candidate_entropies(psm_step2).items()
-        )
-        return best_next_word, next_step_entropy
+def find_guess_with_max_two_step_entropy_with_caching(tsp: TwoStepPlayer) -> str:
+    """deprecated: `TwoStepPlayer.find_guess_with_max_two_step_entropy` caches its
+    results in the player's cache."""
+    warnings.warn(
+        "find_guess_with_max_two_step_entropy_with_caching is deprecated, use "
+        "TwoStepPlayer.find_guess_with_max_two_step_entropy",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return tsp.find_guess_with_max_two_step_entropy()
 
-    def __hash__(self):
-        """implementing a hashing strategy allows to use caching on functions calling"""
-        return hash(self.current_psm)
 
+def _step_two_entropies_in_processes(
+    pool: multiprocessing.pool.Pool,
+    psm: PossibleSolutionsMap,
+    candidate_guesses: list[str],
+    pool_size: int,
+) -> Iterator[float]:
+    """step-two entropies of `candidate_guesses`, in the same order, scored by the
+    `pool_size` worker processes of `pool`, holding the starting map of the player
+    (cf. `workers.process_pool`)."""
+    # workers rebuild the map from its remaining solutions and candidates
+    state = (
+        psm.state_id,
+        psm.rows,
+        psm.candidate_columns if psm.hard_mode else None,
+    )
+    chunksize = workers.chunksize(len(candidate_guesses), pool_size)
+    tasks = [
+        (*state, candidate_guesses[i : i + chunksize])
+        for i in range(0, len(candidate_guesses), chunksize)
+    ]
+    for entropies in pool.imap(_step_two_entropies_in_worker, tasks):
+        yield from entropies
 
-@functools.lru_cache(maxsize=300)
-def find_guess_with_max_two_step_entropy_with_caching(tsp: TwoStepPlayer) -> str:
-    """unfortunately, caching is not instance specific"""
-    return tsp.calculate_two_step_entropies().index[0]
+
+def _step_two_entropy(psm: PossibleSolutionsMap, first_guess: str) -> float:
+    probabilities, best_entropies = map.best_next_entropies(
+        psm, psm.column_index(first_guess)
+    )
+    return float(probabilities @ best_entropies)
+
+
+# state id and map of the last decision scored by the worker
+_worker_decision: tuple[str, PossibleSolutionsMap] = (None, None)
+
+
+def _step_two_entropies_in_worker(task: tuple) -> list[float]:
+    global _worker_decision
+    state_id, rows, columns, candidate_guesses = task
+    if _worker_decision[0] != state_id:
+        starting_psm = workers.worker_state()
+        _worker_decision = (state_id, starting_psm.subset(rows, columns))
+    psm = _worker_decision[1]
+    return [_step_two_entropy(psm, guess) for guess in candidate_guesses]
@@ -0,0 +1,59 @@
+"""pools of worker processes sharing the outcome matrix of a player.
+
+each worker holds its own copy of a state (e.g. a player, or a starting map), sent once
+when the pool starts (cf. `worker_state`) rather than with every task. the outcome
+matrix of the state isn't copied: workers memory-map the same file (cf.
+`PatternMatrix.memory_mapped`).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+import pickle
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import Pool
+
+    from wordle.player.map import PatternMatrix
+
+_worker_state: Any = None
+
+
+@contextlib.contextmanager
+def process_pool(
+    pool_size: int, state: Any, matrix: PatternMatrix = None
+) -> Iterator[Pool]:
+    """a pool of `pool_size` worker processes, each holding a copy of `state`.
+
+    args:
+        matrix: the outcome matrix of `state`, memory-mapped while the pool is open"""
+    with contextlib.ExitStack() as stack:
+        if matrix is not None:
+            stack.enter_context(matrix.memory_mapped())
+        # the state is explicitly pickled (once the matrix is memory-mapped) so that,
+        # whatever the start method, workers memory-map the outcome matrix instead of
+        # inheriting or receiving a copy.
+        yield stack.enter_context(
+            multiprocessing.Pool(
+                pool_size, initializer=_init_worker, initargs=(pickle.dumps(state),)
+            )
+        )
+
+
+def worker_state() -> Any:
+    """the copy of the state held by the current worker process (cf. `process_pool`)."""
+    return _worker_state
+
+
+def chunksize(n_tasks: int, pool_size: int) -> int:
+    """number of tasks sent to a worker at once."""
+    # a few chunks per worker balances the load without paying the dispatch overhead of
+    # sending tasks one by one
+    return max(1, n_tasks // (pool_size * 8))
+
+
+def _init_worker(pickled_state: bytes) -> None:
+    global _worker_state
+    _worker_state = pickle.loads(pickled_state)
@@ -1,8 +1,18 @@
 # -------------------------------------- GUESS VALIDITY --------------------------------------
 
 
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from wordle import pattern
 from wordle.game import Character, CharacterResult, GuessOutcome
 
+_N_LETTERS = 26
+
 
 def is_word_possible_given_guess_outcome(
     candidate_word: str, outcome: GuessOutcome
@@ -14,12 +24,14 @@ def is_word_possible_given_guess_outcome(
 
     if not check:
         return False, msg
-    check, msg = _check_includes_oop_letters(leftover, outcome)
+    check, msg = _check_includes_oop_letters(candidate_word.upper(), leftover, outcome)
 
     if not check:
         return False, msg
 
-    return _check_does_not_include_absent_letters(leftover, outcome)
+    return _check_does_not_include_absent_letters(
+        candidate_word.upper(), leftover, outcome
+    )
 
 
 def _check_shares_correct_letters(
@@ -32,14 +44,13 @@ def _check_shares_correct_letters(
     return True, "correct checks passed"
 
 
-def _check_includes_oop_letters(leftover, outcome):
+def _check_includes_oop_letters(candidate_word, leftover, outcome):
     for oop_gl in outcome.get(CharacterResult.OOP):
-        if oop_gl.position in leftover:
-            if leftover[oop_gl.position] == oop_gl.letter:
-                return (
-                    False,
-                    f"OOP letter `{oop_gl.letter}` should have different position",
-                )
+        if candidate_word[oop_gl.position] == oop_gl.letter:
+            return (
+                False,
+                f"OOP letter `{oop_gl.letter}` should have different position",
+            )
         idx_oop = [i for i, char in leftover.items() if char == oop_gl.letter]
         if not idx_oop:
             return False, f"missing OOP letter `{oop_gl.letter}`"
@@ -47,8 +58,140 @@ def _check_includes_oop_letters(leftover, outcome):
     return True, "oop checks passed"
 
 
-def _check_does_not_include_absent_letters(leftover, outcome):
+def _check_does_not_include_absent_letters(candidate_word, leftover, outcome):
     for absent_gl in outcome.get(CharacterResult.ABSENT):
+        # the letter would be correct at the position where it was guessed
+        if candidate_word[absent_gl.position] == absent_gl.letter:
+            return False, f"`{absent_gl.letter}` should have different position"
         if absent_gl.letter in leftover.values():
-            return False, "`{absent_gl.letter}` should not be included"
+            return False, f"`{absent_gl.letter}` should not be included"
     return True, "all checks passed"
+
+
+# -------------------------------------- BULK FILTERING --------------------------------------
+
+
+@dataclass(frozen=True)
+class LetterConstraints:
+    """constraints on the letters of a word, compiled from guess outcomes. arrays are
+    indexed by letter (`a` -> 0, ..., `z` -> 25), position sets are bitmasks (bit `i` for
+    position `i`).
+
+    attributes:
+        required: positions where the letter must be (correct letters)
+        excluded: positions where the letter can't be (other guessed letters)
+        min_counts: minimum number of occurrences of the letter
+        max_counts: maximum number of occurrences of the letter
+    """
+
+    required: np.ndarray
+    excluded: np.ndarray
+    min_counts: np.ndarray
+    max_counts: np.ndarray
+
+    @classmethod
+    def from_outcomes(
+        cls, outcomes: Sequence[GuessOutcome], word_length: int = 5
+    ) -> LetterConstraints:
+        required = np.zeros(_N_LETTERS, dtype=np.uint16)
+        excluded = np.zeros(_N_LETTERS, dtype=np.uint16)
+        min_counts = np.zeros(_N_LETTERS, dtype=np.uint8)
+        max_counts = np.full(_N_LETTERS, word_length, dtype=np.uint8)
+
+        for outcome in outcomes:
+            letters = pattern.encode_words([outcome.guess_word])[0]
+            counts = np.zeros(_N_LETTERS, dtype=np.uint8)
+            absent = np.zeros(_N_LETTERS, dtype=bool)
+            for gl, letter in zip(outcome, letters):
+                bit = np.uint16(1 << gl.position)
+                if gl.result == CharacterResult.CORRECT:
+                    required[letter] |= bit
+                else:
+                    excluded[letter] |= bit
+                if gl.result == CharacterResult.ABSENT:
+                    absent[letter] = True
+                else:
+                    counts[letter] += 1
+            # an absent letter means the solution has no other occurrence of it
+            np.maximum(min_counts, counts, out=min_counts)
+            max_counts[absent] = np.minimum(max_counts, counts)[absent]
+
+        return cls(required, excluded, min_counts, max_counts)
+
+    @classmethod
+    def from_hints(
+        cls, outcomes: Sequence[GuessOutcome], word_length: int = 5
+    ) -> LetterConstraints:
+        """constraints a guess must satisfy in hard mode: correct letters stay at their
+        position, and OOP letters are used again (cf. `WordleGame.check_hard_mode_guess`).
+        """
+        constraints = cls.from_outcomes(outcomes, word_length)
+        return cls(
+            constraints.required,
+            np.zeros_like(constraints.excluded),
+            constraints.min_counts,
+            np.full_like(constraints.max_counts, word_length),
+        )
+
+
+class WordConstraintsIndex:
+    """per-word letter counts and letter position bitmasks, to check many words against
+    letter constraints at once.
+
+    args:
+        words: the words to filter, all of the same length
+    """
+
+    def __init__(self, words: list[str]):
+        self.words = list(words)
+        encoded = pattern.encode_words(self.words)
+        self.word_length = encoded.shape[1]
+        if self.word_length > 16:
+            raise ValueError("words can't be longer than 16 letters")
+
+        n_words = len(self.words)
+        self.counts = np.zeros((n_words, _N_LETTERS), dtype=np.uint8)
+        self.positions = np.zeros((n_words, _N_LETTERS), dtype=np.uint16)
+        rows = np.arange(n_words)
+        for i in range(self.word_length):
+            np.add.at(self.counts, (rows, encoded[:, i]), 1)
+            self.positions[rows, encoded[:, i]] |= np.uint16(1 << i)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def mask(
+        self, constraints: LetterConstraints, rows: np.ndarray = None
+    ) -> np.ndarray:
+        """returns a boolean array flagging the words satisfying `constraints`, among
+        the words at index `rows` (all of them if None)."""
+        # only the letters with a constraint are checked
+        letters = np.flatnonzero(
+            (constraints.required | constraints.excluded)
+            | (constraints.min_counts > 0)
+            | (constraints.max_counts < self.word_length)
+        )
+        rows = slice(None) if rows is None else rows[:, None]
+        positions = self.positions[rows, letters]
+        counts = self.counts[rows, letters]
+        required = constraints.required[letters]
+
+        possible = ((positions & required) == required).all(axis=1)
+        possible &= ~(positions & constraints.excluded[letters]).any(axis=1)
+        possible &= (counts >= constraints.min_counts[letters]).all(axis=1)
+        possible &= (counts <= constraints.max_counts[letters]).all(axis=1)
+        return possible
+
+    def filter(self, outcomes: Sequence[GuessOutcome]) -> list[str]:
+        """returns the words that can still be the solution after `outcomes`."""
+        constraints = LetterConstraints.from_outcomes(outcomes, self.word_length)
+        return [self.words[i] for i in np.flatnonzero(self.mask(constraints))]
+
+
+def filter_possible_words(
+    words: list[str], outcomes: Sequence[GuessOutcome]
+) -> list[str]:
+    """returns the `words` that can still be the solution after `outcomes` (the words `w`
+    for which `is_word_possible_given_guess_outcome(w, outcome)` holds for each outcome).
+    """
+    return WordConstraintsIndex(words).filter(outcomes)
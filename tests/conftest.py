@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import wordle as wd
+
+SAMPLE_WORDS_PATH = Path(__file__).parents[1] / "data/raw/sample_words.txt"
+
+
+@pytest.fixture(scope="module")
+def psm() -> wd.PossibleSolutionsMap:
+    words = wd.load.load_words_as_dict(SAMPLE_WORDS_PATH)
+    psm = wd.PossibleSolutionsMap(words, list(words))
+    psm.build_map()
+    return psm
+
+
+@pytest.fixture(scope="module")
+def weighted_psm(psm) -> wd.PossibleSolutionsMap:
+    """the sample map, with weights increasing from 0.5 to 2 over its solutions."""
+    weights = dict(zip(psm.solutions, np.linspace(0.5, 2.0, psm.n_solutions)))
+    return wd.PossibleSolutionsMap.from_map(psm.map, weights)
+
+
+def random_words(word_length: int, n_words: int, seed: int = 0) -> list[str]:
+    # a small alphabet gives many repeated letters
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abeilnorst"))
+    return sorted({"".join(rng.choice(letters, word_length)) for _ in range(n_words)})
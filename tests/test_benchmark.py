@@ -0,0 +1,26 @@
+from conftest import SAMPLE_WORDS_PATH
+
+from wordle import benchmark
+
+
+def test_benchmarks_run_and_flag_regressions(tmp_path):
+    benchmarks = benchmark.build_benchmarks(
+        SAMPLE_WORDS_PATH, SAMPLE_WORDS_PATH, SAMPLE_WORDS_PATH
+    )
+    assert "greedy.later_moves" in benchmarks
+    results = benchmark.run_benchmarks(benchmarks, repeat=1, quiet=True)
+    assert all(r.seconds > 0 and r.peak_memory > 0 for r in results.values())
+
+    benchmark.save_results(results, tmp_path / "baseline.json")
+    baseline = benchmark.load_results(tmp_path / "baseline.json")
+    assert baseline == results
+    assert benchmark.find_regressions(results, baseline) == []
+
+    slower = {
+        "build_map": benchmark.BenchmarkResult(
+            results["build_map"].seconds * 2, results["build_map"].peak_memory
+        )
+    }
+    regressions = benchmark.find_regressions(slower, baseline, threshold=0.5)
+    assert len(regressions) == 1 and regressions[0].startswith("build_map: seconds")
+    assert benchmark.find_regressions(slower, baseline, threshold=1.5) == []
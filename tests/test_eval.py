@@ -0,0 +1,141 @@
+import pickle
+from functools import partial
+
+import numpy as np
+import pytest
+
+import wordle as wd
+
+
+def test_pickled_maps_memory_map_the_shared_matrix(psm):
+    filtered = psm.filter_based_on_guess_outcome(
+        wd.WordleGame("rowts").evaluate_guess("pharm")
+    )
+    with psm.pattern_matrix.memory_mapped():
+        psm_copy, filtered_copy = pickle.loads(pickle.dumps((psm, filtered)))
+
+    assert isinstance(psm_copy.outcomes, np.memmap)
+    assert psm_copy.pattern_matrix is filtered_copy.pattern_matrix
+    np.testing.assert_array_equal(psm_copy.outcomes, psm.outcomes)
+    assert filtered_copy.solutions == filtered.solutions
+    assert psm.pattern_matrix.path is None
+
+
+def test_eval_player_in_processes_is_deterministic(psm):
+    eval_words = psm.solutions[:40]
+    player = wd.player.GreedyPlayer(psm)
+
+    sequential = wd.eval.eval_player(eval_words, player)
+    parallel = wd.eval.eval_player(eval_words, player, pool_size=3, processes=True)
+
+    assert list(parallel.scores) == eval_words
+    assert parallel.scores == sequential.scores
+
+
+@pytest.mark.parametrize(
+    "make_player",
+    [
+        wd.player.GreedyPlayer,
+        partial(wd.player.TwoStepPlayer, max_first_guesses=10),
+    ],
+)
+def test_concurrent_games_share_one_player(psm, make_player):
+    eval_words = psm.solutions[:30]
+
+    sequential = wd.eval.eval_player(eval_words, make_player(psm))
+    threaded = wd.eval.eval_player(eval_words, make_player(psm), pool_size=8)
+
+    assert threaded.scores == sequential.scores
+
+
+def test_legacy_stateful_interface(psm):
+    player = wd.player.GreedyPlayer(psm)
+    game = wd.WordleGame("rowts")
+    player.start_new_game()
+    while not game.is_over:
+        player.update(game.record_player_guess(player.make_next_guess(game)))
+
+    expected = wd.play_game(wd.player.GreedyPlayer(psm), wd.WordleGame("rowts"), True)
+    assert [o.guess_word for o in game.guesses_so_far] == [
+        o.guess_word for o in expected.guesses_so_far
+    ]
+    assert player.psm.solutions == ["rowts"]
+
+
+@pytest.mark.parametrize(
+    "make_player",
+    [
+        wd.player.GreedyPlayer,
+        partial(wd.player.TwoStepPlayer, max_first_guesses=10),
+    ],
+)
+def test_lockstep_eval_matches_games_played_one_by_one(psm, make_player):
+    eval_words = psm.solutions[:60]
+    decisions = []
+
+    sequential = wd.eval.eval_player(eval_words, make_player(psm))
+    scores = wd.player.play_games_in_lockstep(
+        make_player(psm), eval_words, on_decision=decisions.append
+    )
+
+    assert scores == sequential.scores
+    assert decisions[0].targets == eval_words
+    n_guesses = sum(7 - score for score in scores.values())
+    assert len(decisions) < n_guesses
+
+
+def test_eval_resumes_from_checkpoint(psm, tmp_path):
+    eval_words = psm.solutions[:20]
+    checkpoint = tmp_path / "scores.jsonl"
+    expected = wd.eval.eval_player(eval_words, wd.player.GreedyPlayer(psm))
+
+    wd.eval.eval_player(
+        eval_words[:8], wd.player.GreedyPlayer(psm), checkpoint=checkpoint
+    )
+    with open(checkpoint, "a") as fp:
+        fp.write('{"word": "trunc')  # a record cut off by an interruption
+    resumed = wd.eval.eval_player(
+        eval_words, wd.player.GreedyPlayer(psm), checkpoint=checkpoint
+    )
+
+    assert list(resumed.scores) == eval_words
+    assert resumed.scores == expected.scores
+    assert wd.eval.EvalResults.from_jsonl(checkpoint).scores == expected.scores
+    # only the 12 words missing from the checkpoint were played
+    assert len(checkpoint.read_text().splitlines()) == 8 + 1 + 12
+    assert repr(resumed) == repr(wd.eval.EvalResults(dict(expected.scores)))
+    assert (resumed.value_counts().values == resumed.distribution()).all()
+
+
+def test_merged_shards_match_a_full_eval(psm, tmp_path):
+    eval_words = psm.solutions[:25]
+    (tmp_path / "words.txt").write_text("\n".join(eval_words))
+    config = {
+        "player": wd.player.GreedyPlayer(psm),
+        "path_to_eval_words_list": tmp_path / "words.txt",
+        "path_to_json_output": tmp_path / "scores.json",
+        "shard_count": 3,
+    }
+    for shard_index in range(3):
+        results, fig = wd.eval.run_eval_from_config(
+            {**config, "shard_index": shard_index}
+        )
+        assert fig is None
+        assert list(results.scores) == eval_words[shard_index::3]
+
+    shards = [
+        wd.eval.EvalResults.from_json(
+            wd.eval.shard_path(tmp_path / "scores.json", i, 3)
+        )
+        for i in range(3)
+    ]
+    merged = wd.eval.EvalResults.merge(shards, eval_words)
+    expected = wd.eval.eval_player(eval_words, wd.player.GreedyPlayer(psm))
+    assert list(merged.scores) == eval_words
+    assert merged.scores == expected.scores
+    assert repr(merged) == repr(expected)
+
+    with pytest.raises(ValueError, match="several shards"):
+        wd.eval.EvalResults.merge([shards[0], shards[1], shards[0]])
+    with pytest.raises(ValueError, match="missing"):
+        wd.eval.EvalResults.merge(shards[:2], eval_words)
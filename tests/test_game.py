@@ -1,12 +1,20 @@
+import pytest
+
 import wordle as wd
 
+SHORTFORM_RESULTS = {
+    "_": wd.game.CharacterResult.ABSENT,
+    "O": wd.game.CharacterResult.OOP,
+    "C": wd.game.CharacterResult.CORRECT,
+}
+
 
 def assert_game_evaluation(word, guess, shortform_expected_outcome: str):
     game = wd.WordleGame(word)
     outcome = game.evaluate_guess(guess)
     for guessed_letter, label in zip(outcome, shortform_expected_outcome):
         assert (
-            guessed_letter.result.value == label
+            guessed_letter.result == SHORTFORM_RESULTS[label]
         ), f"expected {label} for letter {guessed_letter} in word: `{word}`"
 
 
@@ -15,6 +23,24 @@ def test_game_evaluation():
     assert_game_evaluation("crate", "trace", "OCCOC")
     assert_game_evaluation("crate", "treat", "OCOO_")
     assert_game_evaluation("crate", "treta", "_COCO")
+    assert_game_evaluation("abbey", "babes", "OOCC_")
+    assert_game_evaluation("abbey", "kebab", "_OCOO")
+
+
+def test_guess_outcome_round_trip():
+    outcome = wd.WordleGame("crate").evaluate_guess("treat")
+
+    assert outcome.guess_word == "TREAT"
+    assert outcome.ternary == "12110"
+    assert outcome.uint8 == wd.game.score_guess("TREAT", "CRATE") == 1 + 6 + 9 + 27
+    assert [gl.letter for gl in outcome] == list("TREAT")
+    assert outcome[4].result == wd.game.CharacterResult.ABSENT
+    for copy in [
+        wd.game.GuessOutcome.from_uint8("treat", outcome.uint8),
+        wd.game.GuessOutcome.from_guessed_letters(outcome.guessed_letters[::-1]),
+    ]:
+        assert (copy.guess_word, copy.uint8) == (outcome.guess_word, outcome.uint8)
+        assert copy.guessed_letters == outcome.guessed_letters
 
 
 def generate_game_sequence(target_word, guesses: list[str]):
@@ -42,3 +68,16 @@ def test_game_sequence_out_of_guesses():
     assert not game.solved
     assert game.is_over
     assert game.number_of_guesses == 6
+
+
+def test_hard_mode_rejects_guesses_ignoring_hints():
+    game = wd.WordleGame("crate", hard_mode=True)
+    game.record_player_guess("treat")  # OCOO_
+
+    for illegal_guess in ["fusil", "tares", "aster"]:
+        with pytest.raises(wd.game.IllegalGuessException):
+            game.record_player_guess(illegal_guess)
+    assert game.number_of_guesses == 1
+
+    game.record_player_guess("trace")
+    assert generate_game_sequence("crate", ["treat", "fusil"]).number_of_guesses == 2
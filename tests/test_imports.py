@@ -0,0 +1,28 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parents[1] / "src"
+HEAVY_MODULES = ["IPython", "matplotlib", "pandas", "plotly", "sklearn", "tqdm"]
+
+
+def test_games_and_players_only_need_numpy():
+    script = f"""
+import sys
+import wordle as wd
+
+words = wd.load.load_words_as_dict({str(SRC_DIR.parent / "data/raw/sample_words.txt")!r})
+psm = wd.PossibleSolutionsMap(words, list(words))
+psm.build_map()
+game = wd.play_game(wd.player.GreedyPlayer(psm), wd.WordleGame("rowts"), quiet=True)
+assert game.solved
+print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+"""
+    loaded = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    assert loaded == ""
@@ -0,0 +1,50 @@
+import json
+
+import wordle as wd
+from wordle import instrument
+
+
+def test_collector_records_moves_and_exports_a_chrome_trace(psm, tmp_path):
+    eval_words = psm.solutions[:10]
+    player = wd.player.GreedyPlayer(psm)
+    with instrument.collect() as collector:
+        results = wd.eval.eval_player(eval_words, player)
+    assert not instrument.enabled()
+
+    moves = collector.to_frame("move")
+    n_guesses = sum(7 - score for score in results.scores.values())
+    assert len(moves) == n_guesses
+    assert (moves[moves.move == 1].n_solutions == psm.n_solutions).all()
+    assert set(moves.guess[moves.move == 1]) == {moves.guess.iloc[0]}
+
+    summary = collector.summary()
+    assert summary.loc["game", "count"] == len(eval_words)
+    assert summary.loc["eval_player", "count"] == 1
+    counts = collector.counts
+    assert 0 < counts["cache_hits"] + counts["cache_misses"] <= n_guesses
+    assert summary.loc["move", "cache_hits"] == counts["cache_hits"]
+    assert summary.loc["game", "candidates_scored"] == counts["candidates_scored"] > 0
+
+    collector.to_chrome_trace(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as fp:
+        trace = json.load(fp)
+    assert len(trace["traceEvents"]) == len(collector.events)
+    assert {e["ph"] for e in trace["traceEvents"]} == {"X"}
+
+
+def test_spans_do_nothing_when_disabled():
+    assert instrument.span("move") is instrument.span("filter")
+    with instrument.span("move") as span:
+        span.set(guess="crate")
+    instrument.count("cache_hits")
+
+
+def test_moves_record_the_remaining_solutions_of_any_state(psm):
+    player = wd.player.TiledGreedyPlayer(
+        dict(zip(psm.solutions, psm.weights)), psm.allowed_words
+    )
+    with instrument.collect() as collector:
+        wd.play_game(player, wd.WordleGame(psm.solutions[0]), quiet=True)
+
+    moves = collector.to_frame("move")
+    assert moves.n_solutions.iloc[0] == psm.n_solutions
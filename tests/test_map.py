@@ -0,0 +1,196 @@
+import numpy as np
+import pytest
+from conftest import random_words
+
+import wordle as wd
+
+
+def brute_force_filter(words: list[str], outcome: wd.game.GuessOutcome) -> list[str]:
+    return [
+        word
+        for word in words
+        if wd.WordleGame(word).evaluate_guess(outcome.guess_word).uint8 == outcome.uint8
+    ]
+
+
+@pytest.mark.parametrize("target", ["rowts", "black", "relet"])
+def test_filter_based_on_guess_outcome(psm, target):
+    game = wd.WordleGame(target)
+    filtered = psm
+    for guess in ["pharm", "herls", "relet"]:
+        outcome = game.evaluate_guess(guess)
+        expected = brute_force_filter(filtered.solutions, outcome)
+        filtered = filtered.filter_based_on_guess_outcome(outcome)
+
+        assert filtered.solutions == expected
+        assert list(filtered.possible_solutions.index) == expected
+        assert list(filtered.map.index) == expected
+        np.testing.assert_array_equal(
+            filtered.map.to_numpy(), psm.map.loc[expected].to_numpy()
+        )
+        assert target in filtered.solutions
+
+
+def test_filtered_maps_share_or_compact_the_outcome_matrix(psm):
+    # the guess (and outcome) that keeps the largest number of possible solutions
+    counts = np.stack([np.bincount(codes, minlength=243) for codes in psm.outcomes.T])
+    column, code = np.unravel_index(counts.argmax(), counts.shape)
+
+    large = psm.filter_by_outcome_code(column, code)
+    assert large.n_solutions == counts.max() > psm.n_solutions / 4
+    np.testing.assert_array_equal(large.outcomes, psm.outcomes[large.rows])
+
+    small = large.filter_by_outcome_code(psm.column_index("pharm"), 0)
+    assert 0 < small.n_solutions <= large.n_solutions / 4
+    assert small.outcomes.flags.c_contiguous
+    np.testing.assert_array_equal(small.outcomes, psm.outcomes[small.rows])
+
+
+def test_subset_keeps_the_given_solutions(psm):
+    filtered = psm.filter_based_on_guess_outcome(
+        wd.WordleGame("rowts").evaluate_guess("pharm")
+    )
+    for parent in [psm, filtered]:
+        rows = parent.rows[::3]
+        subset = parent.subset(rows[::-1])
+        np.testing.assert_array_equal(subset.rows, rows)
+        np.testing.assert_array_equal(subset.outcomes, psm.outcomes[rows])
+        assert parent.subset().state_id == parent.state_id
+
+    with pytest.raises(ValueError):
+        filtered.subset(np.setdiff1d(psm.rows, filtered.rows)[:1])
+
+
+def test_from_map_round_trip(psm, tmp_path):
+    psm.to_pickle(tmp_path / "psm.pkl")
+    reloaded = wd.PossibleSolutionsMap.from_pickle(tmp_path / "psm.pkl")
+    assert reloaded.solutions == psm.solutions
+    np.testing.assert_array_equal(reloaded.outcomes, psm.outcomes)
+    assert reloaded.get_candidate_entropy("pharm") == pytest.approx(
+        psm.get_candidate_entropy("pharm")
+    )
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_candidate_entropies_match_single_candidate_entropy(
+    psm, weighted_psm, weighted
+):
+    psm = weighted_psm if weighted else psm
+    filtered = psm.filter_based_on_guess_outcome(
+        wd.WordleGame("rowts").evaluate_guess("pharm")
+    )
+
+    for m in [psm, filtered]:
+        entropies = wd.player.map.compute_candidate_entropies(m)
+        expected = [m.get_candidate_entropy(word) for word in m.allowed_words]
+        np.testing.assert_allclose(entropies, expected, atol=1e-12)
+
+
+def test_top_candidates():
+    entropies = np.array([1.0, 3.0, 2.0, 3.0, 0.5, 2.0])
+    np.testing.assert_array_equal(wd.player.map.top_candidates(entropies, 1), [1])
+    np.testing.assert_array_equal(wd.player.map.top_candidates(entropies, 3), [1, 3, 2])
+    np.testing.assert_array_equal(
+        wd.player.map.top_candidates(entropies), [1, 3, 2, 5, 0, 4]
+    )
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_best_next_entropies_match_filtered_maps(psm, weighted_psm, weighted):
+    psm = weighted_psm if weighted else psm
+
+    for guess in ["pharm", "rowts", "black"]:
+        column = psm.column_index(guess)
+        probabilities, best = wd.player.map.best_next_entropies(psm, column)
+
+        codes = np.unique(psm.column_outcomes(column))
+        filtered = [psm.filter_by_outcome_code(column, code) for code in codes]
+        expected_probabilities = [m.weights.sum() / psm.weights.sum() for m in filtered]
+        expected_best = [
+            wd.player.get_all_candidate_entropies(m, k=1).iloc[0] for m in filtered
+        ]
+        np.testing.assert_allclose(probabilities, expected_probabilities, atol=1e-12)
+        np.testing.assert_allclose(best, expected_best, atol=1e-12)
+
+    # a single partition holding all the solutions is too large to be counted pairwise
+    _, best = wd.player.map.partition_best_entropies(
+        psm.outcomes,
+        np.zeros(psm.n_solutions, dtype=np.uint8),
+        psm.weights if weighted else None,
+        psm.n_outcomes,
+    )
+    np.testing.assert_allclose(
+        best, [wd.player.get_all_candidate_entropies(psm, k=1).iloc[0]], atol=1e-12
+    )
+
+
+def test_hard_mode_narrows_candidate_guesses(psm):
+    game = wd.WordleGame("relet", hard_mode=True)
+    hard, legal = psm.with_hard_mode(), list(psm.allowed_words)
+    assert hard.state_id != psm.state_id
+
+    for guess in ["black", "herls"]:
+        game.record_player_guess(guess)
+        hard = hard.filter_based_on_guess_outcome(game.guesses_so_far[-1])
+        legal = [
+            word for word in legal if not _raises(game.check_hard_mode_guess, word)
+        ]
+
+        assert [hard.allowed_words[c] for c in hard.candidate_columns] == legal
+        np.testing.assert_array_equal(
+            hard.candidate_outcomes,
+            psm.outcomes[np.ix_(hard.rows, hard.candidate_columns)],
+        )
+        entropies = wd.player.map.get_all_candidate_entropies(hard)
+        assert sorted(entropies.index) == sorted(legal)
+
+
+def _raises(function, *args) -> bool:
+    try:
+        function(*args)
+    except wd.game.IllegalGuessException:
+        return True
+    return False
+
+
+@pytest.mark.parametrize("word_length", [4, 7])
+def test_greedy_player_word_lengths(word_length):
+    words = random_words(word_length, 400, seed=word_length)
+    psm = wd.PossibleSolutionsMap(dict.fromkeys(words[::4], 1.0), words)
+    psm.build_map()
+    assert psm.n_outcomes == 3**word_length
+
+    player = wd.player.GreedyPlayer(psm)
+    for target in psm.solutions[:10]:
+        game = wd.play_game(player, wd.WordleGame(target), quiet=True)
+        assert game.solved
+        assert len(game.guesses_so_far[-1].ternary) == word_length
+
+
+@pytest.mark.parametrize("weighted, hard_mode", [(False, False), (True, True)])
+def test_histograms_are_updated_across_guesses(weighted, hard_mode):
+    words = random_words(4, 400)
+    weights = np.linspace(0.5, 2.0, len(words)) if weighted else np.ones(len(words))
+    # guesses with a single letter of the solutions: most solutions are kept
+    psm = wd.PossibleSolutionsMap(dict(zip(words, weights)), words + ["zzza", "zzzb"])
+    psm.build_map()
+    if hard_mode:
+        psm = psm.with_hard_mode()
+    assert psm.tracks_histograms()
+    wd.player.map.compute_candidate_entropies(psm)
+
+    for guess in ["zzza", "zzzb"]:
+        filtered = psm.filter_based_on_guess_outcome(
+            wd.WordleGame("test").evaluate_guess(guess)
+        )
+        assert filtered._histograms_source is not None
+        expected = wd.player.map.candidate_entropies(
+            filtered.candidate_outcomes,
+            filtered.weights if weighted else None,
+            filtered.n_outcomes,
+            filtered.weights.sum(),
+        )
+        np.testing.assert_allclose(
+            wd.player.map.compute_candidate_entropies(filtered), expected, atol=1e-12
+        )
+        psm = filtered
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import numpy as np
+from conftest import SAMPLE_WORDS_PATH
+
+import wordle as wd
+
+
+def write_words(path: Path, words: list[str]) -> Path:
+    path.write_text("\n".join(words))
+    return path
+
+
+def test_load_or_build_map_reuses_and_invalidates_cache(tmp_path):
+    words = wd.load.load_words_as_list(SAMPLE_WORDS_PATH)
+    possible_path = write_words(tmp_path / "possible.txt", words[:40])
+    allowed_path = write_words(tmp_path / "allowed.txt", words)
+    cache_dir = tmp_path / "cache"
+
+    psm = wd.player.load_or_build_map(possible_path, allowed_path, cache_dir)
+    matrix, _, _ = wd.player.matrix_cache.open_matrix(next(cache_dir.iterdir()))
+    assert isinstance(matrix, np.memmap)
+
+    reloaded = wd.player.load_or_build_map(possible_path, allowed_path, cache_dir)
+    np.testing.assert_array_equal(reloaded.map.to_numpy(), psm.map.to_numpy())
+    assert list(reloaded.map.columns) == words
+    assert len(list(cache_dir.iterdir())) == 1
+
+    write_words(possible_path, words[:30])
+    rebuilt = wd.player.load_or_build_map(possible_path, allowed_path, cache_dir)
+    assert rebuilt.n_solutions == 30
+    assert len(list(cache_dir.iterdir())) == 2
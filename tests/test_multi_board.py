@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import wordle as wd
+
+
+def test_multi_board_game():
+    game = wd.MultiBoardGame(["crate", "rowts"])
+    assert game.max_guesses == 7
+
+    assert [o.ternary for o in game.record_player_guess("crate")] == ["22222", "01020"]
+    outcomes = game.record_player_guess("rowts")
+    assert outcomes[0] is None and outcomes[1].guess_word == "ROWTS"
+
+    assert game.is_over and game.solved
+    assert game.number_of_guesses == 2
+    assert game.score == (7 - 1 + 1) + (7 - 2 + 1)
+    with pytest.raises(wd.game.GameOverException):
+        game.record_player_guess("crate")
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_board_candidate_entropies(psm, weighted_psm, weighted):
+    psm = weighted_psm if weighted else psm
+    # boards of different sizes, some of them small enough to be counted pairwise
+    boards = [psm] + [
+        psm.filter_based_on_guess_outcome(wd.WordleGame(target).evaluate_guess(guess))
+        for target, guess in [
+            ("rowts", "pharm"),
+            ("black", "relet"),
+            ("relet", "rowts"),
+        ]
+    ]
+
+    expected = [wd.player.map.compute_candidate_entropies(board) for board in boards]
+    np.testing.assert_allclose(
+        wd.player.map.board_candidate_entropies(boards), expected, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("n_boards", [2, 4])
+def test_multi_board_player_solves_games(psm, n_boards):
+    player = wd.player.MultiBoardPlayer(psm, n_boards=n_boards)
+    rng = np.random.default_rng(n_boards)
+    for _ in range(5):
+        targets = list(rng.choice(psm.solutions, n_boards, replace=False))
+        game = wd.player.play_multi_board_game(
+            player, wd.MultiBoardGame(targets), quiet=True
+        )
+        assert game.solved
@@ -0,0 +1,108 @@
+import functools
+import pickle
+
+import numpy as np
+import pytest
+
+import wordle as wd
+
+
+def brute_force_expected_guesses(psm: wd.PossibleSolutionsMap) -> float:
+    """expected number of guesses of the optimal strategy, trying every allowed word."""
+    values = psm.pattern_matrix.values
+    weights = dict(zip(psm.rows, psm.weights))
+    solved = psm.n_outcomes - 1
+
+    @functools.lru_cache(maxsize=None)
+    def expected_guesses(rows: tuple[int, ...]) -> float:
+        if len(rows) == 1:
+            return 1.0
+        total = sum(weights[r] for r in rows)
+        best = np.inf
+        for column in range(values.shape[1]):
+            partitions = {}
+            for r in rows:
+                partitions.setdefault(values[r, column], []).append(r)
+            if len(partitions) == 1 and solved not in partitions:
+                continue
+            best = min(
+                best,
+                1
+                + sum(
+                    sum(weights[r] for r in p) / total * expected_guesses(tuple(p))
+                    for code, p in partitions.items()
+                    if code != solved
+                ),
+            )
+        return best
+
+    return expected_guesses(tuple(psm.rows))
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_solver_matches_brute_force(psm, weighted_psm, weighted):
+    psm = weighted_psm if weighted else psm
+    solver = wd.player.OptimalSolver(psm, top_k=psm.n_allowed)
+
+    filtered = psm.filter_based_on_guess_outcome(
+        wd.WordleGame("relet").evaluate_guess("black")
+    )
+    expected_guesses, _ = solver.solve(filtered)
+
+    assert expected_guesses == pytest.approx(brute_force_expected_guesses(filtered))
+
+
+def test_strategy_tree_achieves_expected_guesses(psm):
+    solver = wd.player.OptimalSolver(psm, top_k=3)
+    expected_guesses, first_guess = solver.solve()
+    tree = solver.strategy_tree()
+
+    assert tree.guess(0) == first_guess
+    scores = np.array(list(tree.scores().values()))
+    assert (scores > 0).all()
+    assert np.mean(7 - scores) == pytest.approx(expected_guesses)
+
+    player = wd.player.OptimalPlayer(psm, top_k=3)
+    game = wd.play_game(player, wd.WordleGame(psm.solutions[0]), quiet=True)
+    assert game.solved
+
+
+def test_time_budget(psm):
+    solver = wd.player.OptimalSolver(psm, top_k=10, time_budget=0)
+    expected_guesses, _ = solver.solve()
+
+    assert solver.timed_out
+    assert expected_guesses >= wd.player.OptimalSolver(psm, top_k=10).solve()[0]
+    assert np.isfinite(expected_guesses)
+
+
+def test_truncated_searches_are_not_memoized(psm):
+    solver = wd.player.OptimalSolver(psm, top_k=10, time_budget=0)
+    approximate, _ = solver.solve()
+
+    solver.time_budget = None
+    expected_guesses, guess = solver.solve()
+
+    assert not solver.timed_out
+    assert (expected_guesses, guess) == wd.player.OptimalSolver(psm, top_k=10).solve()
+    assert expected_guesses < approximate
+
+
+def test_solutions_must_be_allowed_words(psm):
+    words = dict(zip(psm.solutions, psm.weights))
+    partial = wd.PossibleSolutionsMap(words, psm.solutions[1:])
+    partial.build_map()
+
+    with pytest.raises(ValueError, match="aren't allowed words"):
+        wd.player.OptimalSolver(partial).solve()
+
+
+def test_pickled_player_memory_maps_the_matrix(psm):
+    player = wd.player.OptimalPlayer(psm, top_k=3)
+    with psm.pattern_matrix.memory_mapped():
+        pickled = pickle.dumps(player)
+        player_copy = pickle.loads(pickled)
+
+    assert len(pickled) < psm.pattern_matrix.values.nbytes
+    assert isinstance(player_copy.solver._matrix.values, np.memmap)
+    assert player_copy.solver.solve() == player.solver.solve()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from conftest import SAMPLE_WORDS_PATH, random_words
+
+import wordle as wd
+
+
+def evaluate_with_game(solutions: list[str], guesses: list[str]) -> np.ndarray:
+    return np.array(
+        [
+            [wd.WordleGame(solution).evaluate_guess(guess).uint8 for guess in guesses]
+            for solution in solutions
+        ],
+        dtype=np.uint8,
+    )
+
+
+def test_outcome_codes_repeated_letters():
+    solutions = ["crate", "eerie", "speed", "abbey", "geese"]
+    guesses = ["treat", "treta", "eerie", "essee", "beebe", "kebab", "ebbed"]
+    expected = evaluate_with_game(solutions, guesses)
+    actual = wd.pattern.build_outcome_matrix(solutions, guesses)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_build_outcome_matrix_matches_game():
+    words = wd.load.load_words_as_list(SAMPLE_WORDS_PATH)
+    expected = evaluate_with_game(words[:60], words)
+    actual = wd.pattern.build_outcome_matrix(
+        words[:60], words, row_chunk_size=7, col_chunk_size=50
+    )
+    assert actual.dtype == np.uint8
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize(
+    "word_length, dtype",
+    [(4, np.uint8), (5, np.uint8), (6, np.uint16), (7, np.uint16), (8, np.uint16)],
+)
+def test_build_outcome_matrix_word_lengths(word_length, dtype):
+    words = random_words(word_length, 150)
+    expected = [
+        [wd.game.score_guess(guess, solution) for guess in words]
+        for solution in words[:40]
+    ]
+    actual = wd.pattern.build_outcome_matrix(words[:40], words)
+
+    assert actual.dtype == dtype
+    np.testing.assert_array_equal(actual, expected)
+    code = int(actual.max())
+    assert code > 3 ** (word_length - 1)
+    ternary = wd.game.decimal_to_ternary(code, word_length)
+    assert wd.game.ternary_to_decimal(ternary) == code
+
+
+def test_unsupported_word_lengths():
+    for word_length in [3, 9]:
+        with pytest.raises(ValueError):
+            wd.pattern.build_outcome_matrix(
+                random_words(word_length, 5), ["a" * word_length]
+            )
+    with pytest.raises(ValueError):
+        wd.pattern.build_outcome_matrix(["crate"], ["crates"])
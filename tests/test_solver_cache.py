@@ -0,0 +1,58 @@
+import numpy as np
+
+import wordle as wd
+from wordle.player.solver_cache import SolverCache
+
+
+def test_state_id_is_canonical(psm):
+    # the same remaining solutions, reached through different guesses
+    target = wd.WordleGame("rowts")
+    first = psm.filter_based_on_guess_outcome(target.evaluate_guess("pharm"))
+    first = first.filter_based_on_guess_outcome(target.evaluate_guess("herls"))
+    second = psm.filter_based_on_guess_outcome(target.evaluate_guess("herls"))
+    second = second.filter_based_on_guess_outcome(target.evaluate_guess("pharm"))
+
+    assert first.solutions == second.solutions
+    assert first is not second
+    assert first.state_id == second.state_id
+    assert first == second and hash(first) == hash(second)
+    assert first.state_id != psm.state_id
+
+    reweighted = wd.PossibleSolutionsMap.from_map(
+        psm.map, dict.fromkeys(psm.solutions, 2.0)
+    )
+    assert reweighted.state_id != psm.state_id
+
+
+def test_entry_based_eviction_and_counters():
+    cache = SolverCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # `b` becomes the least recently used entry
+    cache.put("c", 3)
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.get_or_compute("b", lambda: 4) == 4
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (1, 2, 2, 2)
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats.hits == 0
+
+
+def test_byte_based_eviction():
+    cache = SolverCache(max_entries=None, max_bytes=2_500)
+    for key in range(3):
+        cache.put(key, np.zeros(100))  # 800 bytes each
+    cache.put(3, np.zeros(100))
+    assert list(cache._entries) == [1, 2, 3]
+    assert cache.stats.nbytes == 2_400
+    assert cache.stats.evictions == 1
+
+
+def test_player_cache_hits_across_games(psm):
+    player = wd.player.GreedyPlayer(psm, cache=SolverCache(max_entries=50))
+    for target in ["rowts", "black"]:
+        wd.play_game(player, wd.WordleGame(target), quiet=True)
+    assert player.cache.stats.hits >= 1
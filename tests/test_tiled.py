@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import wordle as wd
+from wordle.player import tiled
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("k", [5, None])
+def test_tiled_entropies_match_full_matrix(psm, weighted_psm, weighted, k):
+    psm = weighted_psm if weighted else psm
+    weights = psm.weights if weighted else None
+    expected = wd.player.get_all_candidate_entropies(psm, k=k)
+
+    # a tiny budget splits the computation in many tiles and chunks of rows
+    for memory_budget in [20_000, tiled.DEFAULT_MEMORY_BUDGET]:
+        entropies = tiled.tiled_candidate_entropies(
+            psm.solutions, psm.allowed_words, weights, k, memory_budget
+        )
+        pd.testing.assert_series_equal(entropies, expected, rtol=1e-12)
+
+
+def test_tiled_entropies_streamed_from_disk(psm, tmp_path):
+    outcomes = np.lib.format.open_memmap(
+        tmp_path / "map.npy", mode="w+", dtype=np.uint8, shape=psm.outcomes.shape
+    )
+    wd.pattern.build_outcome_matrix(psm.solutions, psm.allowed_words, out=outcomes)
+    outcomes.flush()
+
+    entropies = tiled.tiled_candidate_entropies(
+        psm.solutions,
+        psm.allowed_words,
+        memory_budget=20_000,
+        outcomes=np.load(tmp_path / "map.npy", mmap_mode="r"),
+    )
+    pd.testing.assert_series_equal(
+        entropies, wd.player.get_all_candidate_entropies(psm, k=10)
+    )
+
+
+def test_tiled_player_plays_like_greedy_player(psm):
+    player = wd.player.TiledGreedyPlayer(
+        dict.fromkeys(psm.solutions, 1.0), psm.allowed_words, memory_budget=100_000
+    )
+    greedy = wd.player.GreedyPlayer(psm)
+    for target in psm.solutions[::20]:
+        game = wd.play_game(player, wd.WordleGame(target), quiet=True)
+        expected = wd.play_game(greedy, wd.WordleGame(target), quiet=True)
+        assert [o.guess_word for o in game.guesses_so_far] == [
+            o.guess_word for o in expected.guesses_so_far
+        ]
@@ -0,0 +1,36 @@
+import pytest
+
+import wordle as wd
+
+
+def test_tree_player_replays_the_expanded_player(psm, tmp_path):
+    targets = psm.solutions[:80]
+    tree = wd.player.StrategyTree.from_player(wd.player.GreedyPlayer(psm), targets)
+    tree.to_npz(tmp_path / "tree.npz")
+    tree_player = wd.player.TreePlayer(
+        wd.player.StrategyTree.from_npz(tmp_path / "tree.npz")
+    )
+
+    for target in targets[::7]:
+        expected = wd.play_game(
+            wd.player.GreedyPlayer(psm), wd.WordleGame(target), quiet=True
+        )
+        game = wd.play_game(tree_player, wd.WordleGame(target), quiet=True)
+        assert [o.guess_word for o in game.guesses_so_far] == [
+            o.guess_word for o in expected.guesses_so_far
+        ]
+
+    expected_scores = wd.eval.eval_player(targets, wd.player.GreedyPlayer(psm))
+    assert tree.scores() == expected_scores.scores
+    assert tree_player.tree.scores() == expected_scores.scores
+
+
+def test_tree_rejects_solutions_it_was_not_built_for(psm):
+    tree = wd.player.StrategyTree.from_player(
+        wd.player.GreedyPlayer(psm), psm.solutions[:20]
+    )
+    player = wd.player.TreePlayer(tree)
+    game = wd.WordleGame(psm.solutions[-1])
+
+    with pytest.raises(KeyError):
+        wd.play_game(player, game, quiet=True)
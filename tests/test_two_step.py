@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import wordle as wd
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_branch_and_bound_search_matches_exhaustive_search(psm, weighted_psm, weighted):
+    psm = weighted_psm if weighted else psm
+    player = wd.player.TwoStepPlayer(psm)
+
+    for m in [
+        psm,
+        psm.filter_based_on_guess_outcome(
+            wd.WordleGame("rowts").evaluate_guess("pharm")
+        ),
+    ]:
+        exhaustive = player.calculate_two_step_entropies(m)
+        search = player.search_two_step_guess(m)
+
+        assert search.guess_word == exhaustive.index[0]
+        assert search.entropy_total == exhaustive["entropy_total"].iloc[0]
+        assert search.n_candidates == len(exhaustive)
+        assert 0 < search.n_pruned < search.n_candidates
+        guess = player.find_guess_with_max_two_step_entropy(m)
+        pruning = wd.player.TwoStepPlayer(psm, prune=True)
+        assert pruning.find_guess_with_max_two_step_entropy(m) == guess
+
+
+def test_expected_best_next_entropy_stops_below_threshold(psm):
+    codes = np.zeros(psm.n_solutions, dtype=np.uint8)
+    args = (psm.outcomes, codes, None, psm.n_outcomes)
+    exact_entropy, exact = wd.player.map.expected_best_next_entropy(*args)
+    bound, bounded_exact = wd.player.map.expected_best_next_entropy(
+        *args, at_least=np.log2(psm.n_solutions) + 1
+    )
+
+    assert exact and not bounded_exact
+    assert exact_entropy < bound == pytest.approx(np.log2(psm.n_solutions))
+
+
+def test_step_two_entropies_scored_in_processes(psm):
+    filtered = psm.filter_based_on_guess_outcome(
+        wd.WordleGame("rowts").evaluate_guess("pharm")
+    )
+    player = wd.player.TwoStepPlayer(psm, pool_size=2)
+    for m in [psm, filtered]:
+        sequential = wd.player.TwoStepPlayer(psm).calculate_two_step_entropies(m)
+        parallel = player.calculate_two_step_entropies(m)
+
+        pd.testing.assert_frame_equal(parallel, sequential)
+    # the workers, and the matrix they share, are kept for the next decisions
+    assert psm.pattern_matrix.path is not None
+    player.close()
+    assert psm.pattern_matrix.path is None
+
+
+def test_concurrent_games_share_the_player_workers(psm):
+    eval_words = psm.solutions[:30]
+    player = wd.player.TwoStepPlayer(psm, pool_size=2)
+
+    sequential = wd.eval.eval_player(eval_words, wd.player.TwoStepPlayer(psm))
+    threaded = wd.eval.eval_player(eval_words, player, pool_size=8)
+    player.close()
+
+    assert threaded.scores == sequential.scores
+    assert psm.pattern_matrix.path is None
+
+
+def test_hard_mode_step_two_entropy(psm):
+    player = wd.player.TwoStepPlayer(psm, hard_mode=True)
+    hard, guess = player.starting_psm, "earst"
+    column = hard.column_index(guess)
+
+    # best entropy of the candidates left after each outcome, from the filtered maps
+    probabilities, expected = [], []
+    for code in np.unique(hard.column_outcomes(column)):
+        filtered = hard.filter_by_outcome_code(column, code)
+        probabilities.append(filtered.weights.sum() / hard.weights.sum())
+        expected.append(wd.player.map.get_all_candidate_entropies(filtered).iloc[0])
+    entropy_step_2 = player.get_step_two_entropy(guess, psm=hard)
+    assert entropy_step_2 == pytest.approx(np.dot(probabilities, expected))
+    # hints narrow the next guesses: the look-ahead can't do better than in normal mode
+    assert entropy_step_2 < wd.player.TwoStepPlayer(psm).get_step_two_entropy(guess)
+
+    exhaustive = player.calculate_two_step_entropies(hard)
+    assert player.search_two_step_guess(hard).guess_word == exhaustive.index[0]
+
+
+def test_deprecated_cached_search(psm):
+    player = wd.player.TwoStepPlayer(psm, max_first_guesses=10)
+
+    with pytest.deprecated_call():
+        guess = wd.player.two_step.find_guess_with_max_two_step_entropy_with_caching(
+            player
+        )
+
+    assert guess == player.find_guess_with_max_two_step_entropy()
+    assert player.cache.max_bytes is not None
@@ -0,0 +1,46 @@
+import numpy as np
+from conftest import SAMPLE_WORDS_PATH
+
+import wordle as wd
+
+
+def possible_with_game(words: list[str], outcomes) -> list[str]:
+    return [
+        word
+        for word in words
+        if all(
+            wd.game.score_guess(outcome.guess_word, word.upper()) == outcome.uint8
+            for outcome in outcomes
+        )
+    ]
+
+
+def test_filter_possible_words_matches_game():
+    words = wd.load.load_words_as_list(SAMPLE_WORDS_PATH)
+    index = wd.valid.WordConstraintsIndex(words)
+    rng = np.random.default_rng(0)
+    for target in rng.choice(words, size=20, replace=False):
+        game = wd.WordleGame(target)
+        outcomes = [game.evaluate_guess(g) for g in rng.choice(words, size=2)]
+
+        expected = possible_with_game(words, outcomes)
+        assert index.filter(outcomes) == expected
+        assert expected == [
+            word
+            for word in words
+            if all(
+                wd.valid.is_word_possible_given_guess_outcome(word, outcome)[0]
+                for outcome in outcomes
+            )
+        ]
+
+
+def test_filter_possible_words_repeated_letters():
+    words = ["abbey", "plate", "belle", "lunge", "spelt", "hotel", "angel"]
+    outcomes = [wd.WordleGame("angel").evaluate_guess("belle")]
+
+    assert outcomes[0].ternary == "01100"
+    # `plate` has no other `E` than the one at the position of an absent `E`
+    assert wd.valid.filter_possible_words(words, outcomes) == ["hotel", "angel"]
+    assert not wd.valid.is_word_possible_given_guess_outcome("plate", outcomes[0])[0]
+    assert wd.valid.filter_possible_words(words, []) == words